@@ -0,0 +1,150 @@
+import os
+import json
+import hashlib
+import numpy as np
+
+# === dtype policy ===
+# Per-sample and per-frame arrays (decoded audio, cleaning, framing, FFT,
+# filterbanks, MFCCs, frame tables) are DTYPE, float32 unless PIPELINE_DTYPE=float64.
+# Storage (cleaned WAVs, .audio_cache, frame store, packed corpus) is always float32.
+# The 12 aggregate features and the fuzzy score are computed in float64 (scoring.py).
+# dtypecheck.py compares the float32 path against float64 and enforces tolerances.
+DTYPE = np.dtype(os.environ.get("PIPELINE_DTYPE", "float32"))
+STORAGE_DTYPE = np.dtype(np.float32)
+
+# === Shared audio loader with an on-disk decode/resample cache ===
+# Decoded mono float32 PCM is kept as <cache>/<key>.npy, where the key is the
+# file's content hash plus everything that changes the samples (target rate,
+# mono, resampler, librosa version). The same clip opened by cleaned.py, mfcc.py,
+# waveform.py, ... is decoded once. Least recently used entries are evicted once
+# the cache grows past CACHE_MAX_BYTES.
+CACHE_DIR = os.environ.get("AUDIO_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".audio_cache"))
+CACHE_MAX_BYTES = int(os.environ.get("AUDIO_CACHE_MAX_BYTES", 2 * 1024**3))
+CACHE_ENABLED = os.environ.get("AUDIO_CACHE", "1") not in ("0", "false")
+SAMPLE_RATE = 16000
+RES_TYPE = "soxr_hq"   # librosa.load default
+HASH_CHUNK = 1 << 20
+
+def _librosa_version():
+    from importlib.metadata import version
+    try:
+        return version("librosa")
+    except Exception:
+        return "unknown"
+
+def content_hash(path):
+    # sha256 of the file, memoized per (path, size, mtime) so unchanged files aren't re-read
+    stat = os.stat(path)
+    memo = os.path.join(CACHE_DIR, "paths", hashlib.sha1(os.path.abspath(path).encode()).hexdigest() + ".json")
+    try:
+        with open(memo, encoding="utf-8") as f:
+            entry = json.load(f)
+        if entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+            return entry["sha256"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(block)
+    digest = h.hexdigest()
+    _atomic_write(memo, json.dumps({"size": stat.st_size, "mtime": stat.st_mtime, "sha256": digest}).encode())
+    return digest
+
+def _atomic_write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+def cache_key(path, sr=SAMPLE_RATE, mono=True, res_type=RES_TYPE):
+    rate = "native" if sr is None else str(int(sr))
+    return f"{content_hash(path)}-{rate}-{'mono' if mono else 'multi'}-{res_type}-{_librosa_version()}"
+
+def load(path, sr=SAMPLE_RATE, mono=True, res_type=RES_TYPE, mmap=False, dtype=None):
+    # Drop-in for librosa.load(path, sr=sr, mono=mono, res_type=res_type) -> (y, sr), y in DTYPE
+    dtype = np.dtype(dtype or DTYPE)
+    if not CACHE_ENABLED:
+        y, out_sr = _decode(path, sr, mono, res_type)
+        return y.astype(dtype, copy=False), out_sr
+
+    key = cache_key(path, sr, mono, res_type)
+    entry = os.path.join(CACHE_DIR, key)
+    try:
+        with open(entry + ".json", encoding="utf-8") as f:
+            meta = json.load(f)
+        y = np.load(entry + ".npy", mmap_mode="r" if mmap else None)
+        os.utime(entry + ".npy")   # mtime = last use, for LRU eviction
+        return (y if y.dtype == dtype else y.astype(dtype)), meta["sr"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    y, out_sr = _decode(path, sr, mono, res_type)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp = f"{entry}.{os.getpid()}.tmp.npy"
+    np.save(tmp, y)
+    os.replace(tmp, entry + ".npy")
+    _atomic_write(entry + ".json", json.dumps({"sr": out_sr, "source": os.path.abspath(path)}).encode())
+    evict()
+    return y.astype(dtype, copy=False), out_sr
+
+def _decode(path, sr, mono, res_type):
+    import librosa
+    y, out_sr = librosa.load(path, sr=sr, mono=mono, res_type=res_type)
+    return y.astype(STORAGE_DTYPE, copy=False), out_sr
+
+def get_duration(path):
+    # Header only, no decode (same fallback as manifest.read_header)
+    try:
+        import soundfile as sf
+        return sf.info(path).duration
+    except Exception:
+        import audioread
+        with audioread.audio_open(path) as f:
+            return f.duration
+
+# === Size bound ===
+def _entries():
+    if not os.path.isdir(CACHE_DIR):
+        return []
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if name.endswith(".npy") and ".tmp" not in name:
+            try:
+                stat = os.stat(os.path.join(CACHE_DIR, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name[:-4]))
+    return entries
+
+def evict(max_bytes=None):
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    entries = sorted(_entries())
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, key in entries:
+        if total <= max_bytes:
+            break
+        for ext in (".npy", ".json"):
+            try:
+                os.remove(os.path.join(CACHE_DIR, key + ext))
+            except OSError:
+                pass
+        total -= size
+        removed += 1
+    return removed
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or empty the decoded-audio cache.")
+    parser.add_argument("--clear", action="store_true", help="remove every cached decode")
+    args = parser.parse_args()
+
+    if args.clear:
+        print(f"🧹 Removed {evict(0)} cached decodes from '{CACHE_DIR}'")
+    entries = _entries()
+    total = sum(size for _, size, _ in entries)
+    print(f"{CACHE_DIR}: {len(entries)} decodes, {total / 1024**2:.1f} MB of {CACHE_MAX_BYTES / 1024**2:.0f} MB")
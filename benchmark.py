@@ -0,0 +1,274 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import multiprocessing as mp
+import numpy as np
+
+# === CONFIG ===
+SAMPLE_RATE = 16000
+DURATIONS = [1, 10, 60, 600, 3600]     # seconds of synthetic audio per run
+BASELINE_PATH = "benchmark_baseline.json"
+RESULTS_PATH = "benchmark_results.json"
+REGRESSION_TOLERANCE = 0.20            # flag stages more than 20% slower than baseline
+SEED = 1234
+
+# === Deterministic speech-like test signal ===
+def synthetic_speech(duration, sr=SAMPLE_RATE, seed=SEED):
+    # Voiced harmonic source with a wandering 100-250 Hz pitch, two formant
+    # resonances, ~4 Hz syllable envelope, regular pauses and a low noise floor
+    from scipy.signal import lfilter
+
+    rng = np.random.default_rng(seed)
+    n = int(duration * sr)
+    t = np.arange(n) / sr
+
+    f0 = 170 + 50 * np.sin(2 * np.pi * 0.3 * t) + 15 * np.sin(2 * np.pi * 2.1 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / sr
+    source = sum(np.sin(k * phase) / k for k in range(1, 16))
+
+    for freq, bw in [(700, 130), (1200, 170)]:
+        r = np.exp(-np.pi * bw / sr)
+        theta = 2 * np.pi * freq / sr
+        source = lfilter([1 - r], [1, -2 * r * np.cos(theta), r * r], source)
+
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) ** 0.5
+    pauses = (np.sin(2 * np.pi * 0.2 * t) > -0.6).astype(float)  # ~30% silence
+    y = source * syllables * pauses
+    y = y / (np.max(np.abs(y)) + 1e-9) * 0.8
+    y += 0.003 * rng.standard_normal(n)
+    return y.astype(np.float32)
+
+def _write_wav(y, path, sr=SAMPLE_RATE):
+    from scipy.io.wavfile import write
+    write(path, sr, y)
+    return path
+
+# === Stages; each gets (y, workdir) and returns a callable to time ===
+def stage_trim_and_pad(y, workdir):
+    from cleaning.cleaned import trim_and_pad
+    path = _write_wav(y, os.path.join(workdir, "clip.wav"))
+    return lambda: trim_and_pad(path)
+
+def stage_mfcc_framing(y, workdir):
+    import features
+    return lambda: features.frame_signal(y, 400, 160)
+
+def stage_mfcc_filterbank(y, workdir):
+    import features
+
+    def run():
+        features.mel_filterbank.cache_clear()
+        features.mfcc_bases.cache_clear()
+        features.mel_filterbank(SAMPLE_RATE, 512, 40)
+        features.mfcc_bases(SAMPLE_RATE, 512, features.MFCC_N_MELS, 13)
+    return run
+
+def stage_mfcc_fft(y, workdir):
+    import features
+    _, frames = features.frame_signal(y, 400, 160)
+    window = np.hamming(400)
+    return lambda: features.power_spectrum(frames, 512, window)
+
+def stage_mfcc(y, workdir):
+    import features
+    return lambda: features.mfcc(y, SAMPLE_RATE)
+
+def stage_framewise_features(y, workdir):
+    # otherpattern.extract_framewise_features path, pYIN included
+    from otherpattern import framewise_features
+    path = _write_wav(y, os.path.join(workdir, "clip.wav"))
+    return lambda: framewise_features(path)
+
+def stage_refined_features_excel(y, workdir):
+    from dataanalysis import extract_refined_features_from_excel
+    mfcc_file, other_file = _frame_tables(y, workdir, excel=True)
+    return lambda: extract_refined_features_from_excel(mfcc_file, other_file)
+
+def stage_refined_features_store(y, workdir):
+    from dataanalysis import extract_refined_features_from_store
+    mfcc_file, other_file = _frame_tables(y, workdir, excel=False)
+    return lambda: extract_refined_features_from_store(mfcc_file, other_file)
+
+def stage_predict(y, workdir):
+    # One scalar prediction per 10 ms frame's worth of feature rows
+    from fuzzy import predict_truth_or_lie_from_features
+    rows = _feature_rows(max(1, len(y) // 160))
+    return lambda: [predict_truth_or_lie_from_features(list(row)) for row in rows]
+
+def stage_predict_batch(y, workdir):
+    from fuzzy import predict_truth_or_lie_batch
+    rows = _feature_rows(max(1, len(y) // 160))
+    return lambda: predict_truth_or_lie_batch(rows)
+
+def _frame_tables(y, workdir, excel):
+    # Synthetic frame tables with the columns mfcc.py / otherpattern.py write
+    import pandas as pd
+    import featurestore
+
+    rng = np.random.default_rng(SEED)
+    n = 1 + len(y) // 160
+    times = np.round(np.arange(n) * 0.01, 3)
+    df_mfcc = pd.DataFrame(rng.normal(0, 30, (n, 13)), columns=[f"MFCC_{i}" for i in range(1, 14)])
+    df_mfcc.insert(0, "Time (s)", times)
+    df_mfcc.insert(0, "Frame", np.arange(n))
+    df_other = pd.DataFrame({
+        "ZCR": rng.uniform(0, 0.2, n), "Energy": rng.uniform(0, 0.1, n),
+        "Pitch": rng.uniform(80, 300, n), "Spectral_Centroid": rng.uniform(200, 4000, n),
+        "Spectral_Flux": rng.uniform(0, 3, n), "Time (s)": times,
+    })
+    mfcc_file = os.path.join(workdir, "mfcc")
+    other_file = os.path.join(workdir, "other")
+    if excel:
+        df_mfcc.to_excel(mfcc_file + ".xlsx", index=False)
+        df_other.to_excel(other_file + ".xlsx", index=False)
+        return mfcc_file + ".xlsx", other_file + ".xlsx"
+    featurestore.save_frames(df_mfcc, mfcc_file)
+    featurestore.save_frames(df_other, other_file)
+    return mfcc_file, other_file
+
+def _feature_rows(n):
+    rng = np.random.default_rng(SEED)
+    low = np.array([0, 0, 0, 0, 0, -3, 0, 0, 0, 0, 0, 0])
+    high = np.array([40, 0.2, 20, 60, 200, 4, 180, 80, 120, 1, 2.5, 9000])
+    return rng.uniform(low, high, (n, 12))
+
+STAGES = {
+    "trim_and_pad": stage_trim_and_pad,
+    "mfcc_framing": stage_mfcc_framing,
+    "mfcc_filterbank": stage_mfcc_filterbank,
+    "mfcc_fft": stage_mfcc_fft,
+    "mfcc": stage_mfcc,
+    "framewise_features": stage_framewise_features,
+    "refined_features_excel": stage_refined_features_excel,
+    "refined_features_store": stage_refined_features_store,
+    "predict": stage_predict,
+    "predict_batch": stage_predict_batch,
+}
+
+# === Measurement (each run in a fresh process) ===
+# Two memory figures: stage_peak_alloc_mb is the tracemalloc peak of the NumPy/Python
+# allocations made during run() alone (signal and stage setup excluded), from one
+# extra untimed run; process_peak_rss_mb is the whole child process's ru_maxrss,
+# synthetic signal and setup included.
+def _peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+        except (ImportError, AttributeError):
+            return None
+
+def _peak_alloc_mb(run):
+    import tracemalloc
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / (1024 * 1024)
+
+def _measure(stage, duration, repeat, queue):
+    # Time real work: with the decode/feature caches on, every repeat after the first
+    # would be a cache hit (and each run would leave a copy in the repo's caches).
+    # Set before any stage imports audioio / featurecache, which read these once.
+    os.environ["AUDIO_CACHE"] = "0"
+    os.environ["FEATURE_CACHE"] = "0"
+    try:
+        y = synthetic_speech(duration)
+        with tempfile.TemporaryDirectory() as workdir:
+            run = STAGES[stage](y, workdir)
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                run()
+                times.append(time.perf_counter() - start)
+            # Untimed, tracemalloc slows allocation-heavy code down
+            peak_alloc = _peak_alloc_mb(run)
+        wall = min(times)
+        queue.put({
+            "stage": stage,
+            "duration": duration,
+            "wall_seconds": wall,
+            "audio_seconds_per_second": duration / wall if wall > 0 else float("inf"),
+            "stage_peak_alloc_mb": peak_alloc,
+            "process_peak_rss_mb": _peak_rss_mb(),
+        })
+    except Exception as e:
+        queue.put({"stage": stage, "duration": duration, "error": f"{type(e).__name__}: {e}"})
+
+def measure(stage, duration, repeat=1):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_measure, args=(stage, duration, repeat, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+def compare(results, baseline, tolerance=REGRESSION_TOLERANCE):
+    reference = {(r["stage"], r["duration"]): r for r in baseline.get("results", []) if "wall_seconds" in r}
+    regressions = []
+    for r in results:
+        base = reference.get((r["stage"], r["duration"]))
+        if base is None or "wall_seconds" not in r:
+            continue
+        r["baseline_wall_seconds"] = base["wall_seconds"]
+        r["ratio"] = r["wall_seconds"] / base["wall_seconds"] if base["wall_seconds"] > 0 else float("inf")
+        if r["ratio"] > 1 + tolerance:
+            regressions.append(r)
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time every pipeline stage on synthetic speech-like audio.")
+    parser.add_argument("--stages", default=",".join(STAGES), help="comma-separated subset of: " + ", ".join(STAGES))
+    parser.add_argument("--durations", default=",".join(map(str, DURATIONS)), help="seconds of audio, comma-separated")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per measurement, fastest is kept")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    parser.add_argument("--output", default=RESULTS_PATH)
+    args = parser.parse_args()
+
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = sorted(set(stages) - set(STAGES))
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+    durations = [float(d) for d in args.durations.split(",")]
+
+    results = []
+    for stage in stages:
+        for duration in durations:
+            r = measure(stage, duration, args.repeat)
+            results.append(r)
+            if "error" in r:
+                print(f"{stage:24s} {duration:7.0f}s  ERROR {r['error']}")
+            else:
+                rss = f"{r['process_peak_rss_mb']:8.1f} MB" if r["process_peak_rss_mb"] is not None else "       n/a"
+                print(f"{stage:24s} {duration:7.0f}s  {r['wall_seconds']:9.4f}s  "
+                      f"{r['audio_seconds_per_second']:10.1f}x  {r['stage_peak_alloc_mb']:8.1f} MB  "
+                      f"(process {rss.strip()})", flush=True)
+
+    report = {"sample_rate": SAMPLE_RATE, "results": results}
+    regressions = []
+    if not args.save_baseline:
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                regressions = compare(results, json.load(f), args.tolerance)
+            for r in regressions:
+                print(f"⚠️ Regression: {r['stage']} @ {r['duration']:.0f}s is {r['ratio']:.2f}x the baseline")
+        else:
+            # Timings are machine-specific, so no baseline ships with the repo
+            print(f"⚠️ No baseline at '{args.baseline}', regression check skipped. "
+                  f"Record one on this machine with --save-baseline.")
+
+    with open(args.baseline if args.save_baseline else args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,109 @@
+import json
+import argparse
+import numpy as np
+import pandas as pd
+
+import fuzzy
+
+# === CONFIG ===
+N_CANDIDATES = 5000
+WEIGHT_RANGE = (0.0, 2.0)       # candidate weight = baseline weight * U(WEIGHT_RANGE)
+BREAKPOINT_JITTER = 0.25        # breakpoints move by up to ±25% of their (high - low) span
+THRESHOLDS = np.arange(20.0, 80.5, 0.5)
+MEMORY_BUDGET = 2e8             # max elements per broadcast block (~1.6 GB of float64)
+
+def load_labelled_features(path, label_column="label"):
+    df = pd.read_csv(path)
+    X = fuzzy.as_feature_matrix(df)
+    labels = df[label_column].astype(str).str.strip().str.lower()
+    y = labels.isin(["truth", "1", "true"]).to_numpy()
+    return X, y
+
+# === Candidate generation ===
+def sample_candidates(n, rng):
+    base_w = fuzzy.weight_array()
+    lows, mids, highs = fuzzy.breakpoint_arrays()
+    span = highs - lows
+
+    weights = base_w * rng.uniform(*WEIGHT_RANGE, size=(n, base_w.size))
+    jitter = rng.uniform(-BREAKPOINT_JITTER, BREAKPOINT_JITTER, size=(n, 3, base_w.size)) * span
+    points = np.stack([lows, mids, highs])[None] + jitter
+    points.sort(axis=1)  # keep low <= mid <= high
+
+    # Candidate 0 is the current configuration
+    weights[0] = base_w
+    points[0] = np.stack([lows, mids, highs])
+    return weights, points[:, 0], points[:, 1], points[:, 2]
+
+# === Broadcast evaluation ===
+def evaluate(X, y, weights, lows, mids, highs, thresholds=THRESHOLDS):
+    # Returns (K, T) true/false positive counts for "Truth" as the positive class
+    n_candidates = weights.shape[0]
+    block = max(1, int(MEMORY_BUDGET // max(1, X.size + len(thresholds) * len(y))))
+    tp = np.empty((n_candidates, len(thresholds)))
+    fp = np.empty_like(tp)
+
+    for start in range(0, n_candidates, block):
+        sl = slice(start, start + block)
+        scores = fuzzy.truth_scores(
+            X[None], weights[sl, None], lows[sl, None], mids[sl, None], highs[sl, None]
+        )                                                            # (k, N)
+        predicted = scores[:, None, :] >= thresholds[None, :, None]  # (k, T, N)
+        tp[sl] = np.sum(predicted & y, axis=-1)
+        fp[sl] = np.sum(predicted & ~y, axis=-1)
+    return tp, fp
+
+def metrics_from_counts(tp, fp, y):
+    positives = np.sum(y)
+    negatives = len(y) - positives
+    tn = negatives - fp
+    with np.errstate(divide="ignore", invalid="ignore"):
+        accuracy = (tp + tn) / len(y)
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+        recall = tp / positives if positives else np.zeros_like(tp)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    return {"accuracy": accuracy, "precision": precision, "recall": recall, "f1": f1}
+
+def calibrate(X, y, n_candidates=N_CANDIDATES, objective="accuracy", seed=0):
+    rng = np.random.default_rng(seed)
+    weights, lows, mids, highs = sample_candidates(n_candidates, rng)
+    tp, fp = evaluate(X, y, weights, lows, mids, highs)
+    metrics = metrics_from_counts(tp, fp, y)
+
+    k, t = np.unravel_index(np.argmax(metrics[objective]), tp.shape)
+    names = fuzzy.FEATURE_NAMES
+    config = {
+        "weights": {name: float(w) for name, w in zip(names, weights[k])},
+        "breakpoints": {
+            name: [float(lows[k, i]), float(mids[k, i]), float(highs[k, i])]
+            for i, name in enumerate(names) if name in fuzzy.BREAKPOINTS
+        },
+        "threshold": float(THRESHOLDS[t]),
+        "metrics": {name: float(values[k, t]) for name, values in metrics.items()},
+    }
+
+    # Current hand-tuned constants at the current threshold, for comparison
+    t_base = np.argmin(np.abs(THRESHOLDS - fuzzy.TRUTH_THRESHOLD))
+    baseline = {name: float(values[0, t_base]) for name, values in metrics.items()}
+    return config, baseline
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search fuzzy.py weights, breakpoints and threshold on labelled features.")
+    parser.add_argument("features_csv", help="CSV with the refined_feature_names columns and a label column")
+    parser.add_argument("--label-column", default="label")
+    parser.add_argument("--candidates", type=int, default=N_CANDIDATES)
+    parser.add_argument("--objective", choices=["accuracy", "precision", "recall", "f1"], default="accuracy")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="fuzzy_config.json")
+    args = parser.parse_args()
+
+    X, y = load_labelled_features(args.features_csv, args.label_column)
+    config, baseline = calibrate(X, y, args.candidates, args.objective, args.seed)
+
+    print(f"Evaluated {args.candidates} configurations x {len(THRESHOLDS)} thresholds on {len(y)} rows")
+    for name in ["accuracy", "precision", "recall", "f1"]:
+        print(f"{name:10s}: current {baseline[name]:.4f} → best {config['metrics'][name]:.4f}")
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    print(f"Best configuration saved to '{args.output}' (load with FUZZY_CONFIG={args.output})")
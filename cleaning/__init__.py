@@ -0,0 +1 @@
+from . import rootpath  # import paths for the cleaning scripts, see rootpath.py
@@ -1,29 +1,44 @@
 import os
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import librosa
 import numpy as np
 from scipy.io.wavfile import write
 import noisereduce as nr
 
+import rootpath  # repo root on sys.path, see rootpath.py
+from instrument import stage
+from workers import set_thread_env, limit_threads
+import audioio
+
 # === CONFIG ===
-INPUT_DIR = "filtered_data"              # ← works on filtered data
+MANIFEST_PATH = "manifest.sqlite"      # ← works on the files filtered.py selected
 OUTPUT_DIR = "cleaned_data"            # ← saves trimmed + padded files
 SAMPLE_RATE = 16000
 # TARGET_DURATION = 15.0  # in seconds
 # TARGET_LENGTH = int(SAMPLE_RATE * TARGET_DURATION)
 
-# === Ensure output folders exist ===
-os.makedirs(os.path.join(OUTPUT_DIR, "lie"), exist_ok=True)
-os.makedirs(os.path.join(OUTPUT_DIR, "truth"), exist_ok=True)
-
 # === Trim, Denoise, Normalize, Pad ===
 def trim_and_pad(audio_path):
-    y, sr = librosa.load(audio_path, sr=SAMPLE_RATE)
+    with stage("decode", audio_path) as rec:
+        y, sr = audioio.load(audio_path, sr=SAMPLE_RATE)
+        rec["audio_seconds"] = len(y) / sr
+    return clean_signal(y, sr)
+
+# === In-memory cleaning of an already decoded signal ===
+def clean_signal(y, sr, dtype=None):
+    # Stays in the pipeline dtype (audioio.DTYPE); callers write float32 WAVs
+    y = np.asarray(y, dtype=dtype or audioio.DTYPE)
+    audio_seconds = len(y) / sr
 
     # Step 1: Noise Reduction
-    y = nr.reduce_noise(y=y, sr=sr)
+    with stage("denoise", audio_seconds=audio_seconds):
+        y = nr.reduce_noise(y=y, sr=sr)
 
     # Step 2: Trim silence
-    y_trimmed, _ = librosa.effects.trim(y, top_db=20)
+    with stage("trim", audio_seconds=audio_seconds):
+        y_trimmed, _ = librosa.effects.trim(y, top_db=20)
 
     # Step 3: Normalize amplitude
     if np.max(np.abs(y_trimmed)) > 0:
@@ -40,16 +55,97 @@ def trim_and_pad(audio_path):
 
     return y_trimmed
 
-# === Process All Files in filtered/ ===
-for label in ["lie", "truth"]:
-    input_folder = os.path.join(INPUT_DIR, label)
-    output_folder = os.path.join(OUTPUT_DIR, label)
+# === Batch runner ===
+def _clean_file(input_path, output_path):
+    # Recordings over filtered.MAX_DURATION go through the block-wise long mode and
+    # come out as <name>_segNNN.wav speech segments next to where output_path would be
+    import longform
+    from manifest import read_header
+
+    if read_header(input_path)[0] > longform.MAX_SEGMENT_SECONDS:
+        stem = os.path.splitext(os.path.basename(output_path))[0]
+        segments = longform.clean_long_file(input_path, os.path.dirname(output_path), stem)
+        return f"{len(segments)} segments in {os.path.dirname(output_path)}"
+
+    with stage("clean_file", input_path):
+        processed_audio = trim_and_pad(input_path)
+        write(output_path, SAMPLE_RATE, processed_audio.astype(np.float32))
+    return output_path
+
+def list_jobs(input_dir, output_dir=OUTPUT_DIR):
+    jobs = []
+    for label in ["lie", "truth"]:
+        input_folder = os.path.join(input_dir, label)
+        output_folder = os.path.join(output_dir, label)
+        os.makedirs(output_folder, exist_ok=True)
+
+        for file in sorted(os.listdir(input_folder)):
+            if file.endswith(".wav"):
+                jobs.append((os.path.join(input_folder, file), os.path.join(output_folder, file)))
+    return jobs
+
+def list_manifest_jobs(db_path=MANIFEST_PATH, output_dir=OUTPUT_DIR):
+    # Files selected by filtered.py, read straight from where the manifest found them
+    import manifest
+
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"no manifest at '{db_path}', run filtered.py first (or pass --input-dir)")
+    jobs = []
+    conn = manifest.connect(db_path)
+    for row in manifest.selected_files(conn):
+        output_folder = os.path.join(output_dir, row["label"])
+        os.makedirs(output_folder, exist_ok=True)
+        jobs.append((row["path"], os.path.join(output_folder, os.path.basename(row["path"]))))
+    return jobs
+
+def process_all(jobs, workers=None, threads_per_worker=1, error_report="cleaning_errors.json"):
+    workers = workers or os.cpu_count() or 1
+    errors = []
+
+    # Children inherit the environment, so set the caps before the pool starts
+    set_thread_env(threads_per_worker)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=limit_threads,
+                             initargs=(threads_per_worker,)) as pool:
+        futures = {pool.submit(_clean_file, src, dst): src for src, dst in jobs}
+        for future in as_completed(futures):
+            src = futures[future]
+            try:
+                output_path = future.result()
+                print(f"Processed {os.path.basename(src)} → {output_path}")
+            except Exception as e:
+                # One bad file must not abort the whole run
+                errors.append({"file": src, "error": f"{type(e).__name__}: {e}"})
+                print(f"⚠️ Failed {src}: {e}")
+
+    if error_report:
+        with open(error_report, "w", encoding="utf-8") as f:
+            json.dump({"processed": len(jobs) - len(errors), "failed": errors}, f, indent=2)
+    return errors
+
+# === Process All Files selected by filtered.py ===
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Denoise, trim and normalize the filtered corpus.")
+    parser.add_argument("--manifest", default=MANIFEST_PATH, help="take the files filtered.py selected in this manifest")
+    parser.add_argument("--input-dir", default=None, help="clean every <dir>/{lie,truth}/*.wav instead of the manifest selection")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: all cores)")
+    parser.add_argument("--threads-per-worker", type=int, default=1, help="BLAS/FFT threads per worker")
+    parser.add_argument("--error-report", default="cleaning_errors.json")
+    parser.add_argument("--pack", metavar="CORPUS", default=None,
+                        help="also pack --output-dir into one memory-mapped corpus (see corpus.py)")
+    args = parser.parse_args()
 
-    for file in os.listdir(input_folder):
-        if file.endswith(".wav"):
-            input_path = os.path.join(input_folder, file)
-            output_path = os.path.join(output_folder, file)
+    if args.input_dir:
+        jobs = list_jobs(args.input_dir, args.output_dir)
+    elif os.path.exists(args.manifest):
+        jobs = list_manifest_jobs(args.manifest, args.output_dir)
+    else:
+        parser.error(f"no manifest at '{args.manifest}': run filtered.py first, or pass --input-dir")
+    errors = process_all(jobs, args.workers, args.threads_per_worker, args.error_report)
+    print(f"Done: {len(jobs) - len(errors)} processed, {len(errors)} failed")
 
-            processed_audio = trim_and_pad(input_path)
-            write(output_path, SAMPLE_RATE, processed_audio.astype(np.float32))
-            print(f"Processed {file} → {output_path}")
+    if args.pack:
+        import corpus
+        n = corpus.pack(corpus.list_clips(args.output_dir), args.pack, SAMPLE_RATE)
+        print(f"✅ Packed {n} clips into '{args.pack}'")
@@ -1,26 +1,38 @@
 import os
-import librosa
-import shutil
+import rootpath  # repo root on sys.path, see rootpath.py
+import manifest
+from instrument import stage
 
 MAX_DURATION = 15.0  # seconds
 input_dir = "normalized_data"
-output_dir = "filtered_data"
+LONG_MODE = False    # keep longer files; cleaned.py splits them into speech segments
 
-os.makedirs(output_dir + "/lie", exist_ok=True)
-os.makedirs(output_dir + "/truth", exist_ok=True)
+if __name__ == "__main__":
+    import argparse
 
-for label in ["lie", "truth"]:
-    path = os.path.join(input_dir, label)
-    for file in os.listdir(path):
-        if file.endswith(".wav"):
-            file_path = os.path.join(path, file)
-            try:
-                duration = librosa.get_duration(path=file_path)
-                if duration <= MAX_DURATION:
-                    # Copy file to new folder if it's within limit
-                    shutil.copy(file_path, os.path.join(output_dir, label, file))
-                    print(f"✅ Kept {file} - {duration:.2f}s")
-                else:
-                    print(f"❌ Skipped {file} - {duration:.2f}s")
-            except Exception as e:
-                print(f"⚠️ Error reading {file_path}: {e}")
+    parser = argparse.ArgumentParser(description="Select clips by duration in the manifest.")
+    parser.add_argument("--long", action="store_true", default=LONG_MODE,
+                        help="keep recordings over MAX_DURATION for segmentation instead of skipping them")
+    args = parser.parse_args()
+
+    # Durations come from the manifest (container headers), nothing is decoded or copied
+    conn = manifest.connect()
+    with stage("manifest_scan"):
+        manifest.scan(conn, input_dir)
+    with stage("filter_by_duration") as rec:
+        selected, skipped = manifest.select_by_duration(conn, input_dir, MAX_DURATION, args.long)
+        rec["audio_seconds"] = sum(row["duration"] for row in selected)
+
+    for row in selected:
+        if row["duration"] > MAX_DURATION:
+            print(f"✂️ Kept {os.path.basename(row['path'])} - {row['duration']:.2f}s (long, will be segmented)")
+        else:
+            print(f"✅ Kept {os.path.basename(row['path'])} - {row['duration']:.2f}s")
+    for row in skipped:
+        file = os.path.basename(row["path"])
+        if row["duplicate_of"] is not None:
+            print(f"❌ Skipped {file} - duplicate of {row['duplicate_of']}")
+        elif row["duration"] is None:
+            print(f"⚠️ Error reading {row['path']}")
+        else:
+            print(f"❌ Skipped {file} - {row['duration']:.2f}s")
@@ -0,0 +1,223 @@
+import os
+import tempfile
+import numpy as np
+from scipy.signal import stft, istft, fftconvolve
+from scipy.io.wavfile import write
+
+import rootpath  # repo root on sys.path, see rootpath.py
+from filtered import MAX_DURATION
+from instrument import stage
+
+# === CONFIG ===
+SAMPLE_RATE = 16000
+BLOCK_SECONDS = 30.0          # audio denoised per step; memory is bounded by this, not the file
+CONTEXT_SECONDS = 0.5         # extra audio on each side of a block so STFT edges don't leak in
+NOISE_SCAN_SECONDS = 30.0     # noise profile is learned once from the start of the recording
+NOISE_PERCENTILE = 10         # quietest 10% of frames there are taken as noise
+FRAME = 160                   # 10 ms frames for the energy track
+TOP_DB = 20                   # speech = frames within 20 dB of the loudest, as trim(top_db=20)
+MERGE_GAP_SECONDS = 1.0       # shorter silences stay inside a segment (they are pause features)
+MIN_SEGMENT_SECONDS = 1.0
+MAX_SEGMENT_SECONDS = MAX_DURATION
+SEGMENT_PAD_SECONDS = 0.1
+
+# Spectral gating parameters, the stationary defaults of noisereduce.reduce_noise
+N_FFT = 1024
+HOP = N_FFT // 4
+N_STD_THRESH = 1.5
+FREQ_MASK_SMOOTH_HZ = 500
+TIME_MASK_SMOOTH_MS = 50
+
+# === Block reader: decode + downmix + resample without loading the whole file ===
+def stream_blocks(path, sr=SAMPLE_RATE, block_seconds=BLOCK_SECONDS):
+    import soundfile as sf
+
+    try:
+        info = sf.info(path)
+    except Exception:
+        # Containers libsndfile can't parse (e.g. AAC in .mp3), as in manifest.read_header
+        yield from _audioread_blocks(path, sr, block_seconds)
+        return
+    resampler = _resampler(info.samplerate, sr)
+    for block in sf.blocks(path, blocksize=int(info.samplerate * block_seconds), dtype="float32", always_2d=True):
+        mono = block.mean(axis=1)
+        yield resampler.resample_chunk(mono) if resampler else mono
+    if resampler:
+        yield resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+
+def _resampler(orig_sr, sr):
+    if orig_sr == sr:
+        return None
+    import soxr
+    return soxr.ResampleStream(orig_sr, sr, 1, dtype="float32")
+
+def _audioread_blocks(path, sr, block_seconds):
+    import audioread
+
+    with audioread.audio_open(path) as f:
+        resampler = _resampler(f.samplerate, sr)
+        target = int(f.samplerate * block_seconds)
+        parts, size = [], 0
+        for buf in f:
+            pcm = np.frombuffer(buf, dtype="<i2").astype(np.float32) / 32768.0
+            parts.append(pcm.reshape(-1, f.channels).mean(axis=1))
+            size += len(parts[-1])
+            if size >= target:
+                mono, parts, size = np.concatenate(parts), [], 0
+                yield resampler.resample_chunk(mono) if resampler else mono
+        if parts:
+            mono = np.concatenate(parts)
+            yield resampler.resample_chunk(mono) if resampler else mono
+        if resampler:
+            yield resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+
+def frame_rms(y, frame=FRAME):
+    n = len(y) // frame
+    return np.sqrt(np.mean(y[:n * frame].reshape(n, frame) ** 2, axis=1))
+
+# === Noise profile (learned once) + stationary spectral gate ===
+def learn_noise_profile(path, sr=SAMPLE_RATE, seconds=NOISE_SCAN_SECONDS):
+    head, total = [], 0
+    for block in stream_blocks(path, sr, block_seconds=min(seconds, BLOCK_SECONDS)):
+        head.append(block)
+        total += len(block)
+        if total >= seconds * sr:
+            break
+    y = np.concatenate(head)[:int(seconds * sr)]
+    rms = frame_rms(y)
+    if len(rms) == 0:
+        return y
+    quiet = np.flatnonzero(rms <= np.percentile(rms, NOISE_PERCENTILE))
+    return y[:len(rms) * FRAME].reshape(len(rms), FRAME)[quiet].ravel()
+
+def _smoothing_filter(n_grad_freq, n_grad_time):
+    # Triangular 2-D kernel, as noisereduce uses to soften the gate mask
+    f = np.concatenate([np.linspace(0, 1, n_grad_freq + 1, endpoint=False), np.linspace(1, 0, n_grad_freq + 2)])[1:-1]
+    t = np.concatenate([np.linspace(0, 1, n_grad_time + 1, endpoint=False), np.linspace(1, 0, n_grad_time + 2)])[1:-1]
+    kernel = np.outer(f, t)
+    return kernel / kernel.sum()
+
+class NoiseGate:
+    def __init__(self, noise, sr=SAMPLE_RATE, prop_decrease=1.0):
+        self.sr = sr
+        self.prop_decrease = prop_decrease
+        _, _, noise_stft = stft(noise, nfft=N_FFT, nperseg=N_FFT, noverlap=N_FFT - HOP, padded=False)
+        noise_db = 20 * np.log10(np.maximum(np.abs(noise_stft), 1e-10))
+        self.threshold = (noise_db.mean(axis=1) + N_STD_THRESH * noise_db.std(axis=1))[:, None]
+        n_grad_freq = int(FREQ_MASK_SMOOTH_HZ / (sr / (N_FFT / 2)))
+        n_grad_time = int(TIME_MASK_SMOOTH_MS / (HOP / sr * 1000))
+        self.kernel = _smoothing_filter(n_grad_freq, n_grad_time)
+
+    def __call__(self, y):
+        _, _, S = stft(y, nfft=N_FFT, nperseg=N_FFT, noverlap=N_FFT - HOP, padded=False)
+        mask = (20 * np.log10(np.maximum(np.abs(S), 1e-10)) > self.threshold).astype(np.float32)
+        mask = mask * self.prop_decrease + (1.0 - self.prop_decrease)
+        mask = fftconvolve(mask, self.kernel, mode="same")
+        _, out = istft(S * mask, nfft=N_FFT, nperseg=N_FFT, noverlap=N_FFT - HOP)
+        result = np.zeros(len(y), dtype=np.float32)
+        result[:min(len(y), len(out))] = out[:len(y)]
+        return result
+
+def denoise_blocks(blocks, gate, sr=SAMPLE_RATE, block_seconds=BLOCK_SECONDS, context_seconds=CONTEXT_SECONDS):
+    # Yields the denoised signal block by block; each block is gated with CONTEXT
+    # samples of real audio on both sides, which are then dropped again. Both are
+    # whole hops, so given the per-file noise profile (one fixed threshold) the output
+    # matches gating the full signal in one STFT to float32 rounding (~1e-7), not bit-exactly.
+    block = int(block_seconds * sr) // HOP * HOP
+    pad = -(-int(context_seconds * sr) // HOP) * HOP
+    history = np.zeros(0, dtype=np.float32)
+    pending = np.zeros(0, dtype=np.float32)
+    for chunk in blocks:
+        pending = np.concatenate([pending, chunk])
+        while len(pending) >= block + pad:
+            window = np.concatenate([history, pending[:block + pad]])
+            yield gate(window)[len(history):len(history) + block]
+            history = np.concatenate([history, pending[:block]])[-pad:]
+            pending = pending[block:]
+    if len(pending):
+        window = np.concatenate([history, pending])
+        yield gate(window)[len(history):]
+
+# === Speech segmentation over the 10 ms energy track ===
+def speech_segments(rms, top_db=TOP_DB, merge_gap=MERGE_GAP_SECONDS, min_len=MIN_SEGMENT_SECONDS,
+                    max_len=MAX_SEGMENT_SECONDS, frame_seconds=FRAME / SAMPLE_RATE):
+    # (start_frame, end_frame) pairs of speech, at most max_len long
+    if len(rms) == 0 or rms.max() <= 0:
+        return []
+    db = 20 * np.log10(np.maximum(rms, 1e-10) / rms.max())
+    edges = np.diff(np.concatenate(([0], (db > -top_db).astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+    merged = []
+    for s, e in zip(starts, ends):
+        if merged and s - merged[-1][1] < merge_gap / frame_seconds:
+            merged[-1][1] = e
+        else:
+            merged.append([s, e])
+
+    max_frames = int(max_len / frame_seconds)
+    min_frames = int(np.ceil(min_len / frame_seconds))
+    segments = []
+    for s, e in merged:
+        # Over-long speech is cut at the quietest frame of the second half of each window,
+        # never so close to the end that the remainder would be shorter than min_len
+        while e - s > max_frames:
+            lo = s + max_frames // 2
+            hi = max(lo + 1, min(s + max_frames, e - min_frames))
+            cut = lo + int(np.argmin(rms[lo:hi]))
+            segments.append((s, cut))
+            s = cut
+        segments.append((s, e))
+    # Only isolated bursts of speech can still be shorter than min_len
+    return [(s, e) for s, e in segments if (e - s) * frame_seconds >= min_len]
+
+# === One long recording → cleaned speech segments ===
+def clean_long_file(input_path, output_dir, stem=None, sr=SAMPLE_RATE):
+    stem = stem or os.path.splitext(os.path.basename(input_path))[0]
+    os.makedirs(output_dir, exist_ok=True)
+
+    with stage("long_noise_profile", input_path):
+        gate = NoiseGate(learn_noise_profile(input_path, sr), sr)
+
+    # Pass 1: denoise block by block into a scratch file, keep only the energy track
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmp:
+        scratch = os.path.join(tmp, "denoised.f32")
+        rms, carry, total = [], np.zeros(0, dtype=np.float32), 0
+        with stage("long_denoise", input_path) as rec, open(scratch, "wb") as f:
+            for y in denoise_blocks(stream_blocks(input_path, sr), gate, sr):
+                f.write(y.astype(np.float32).tobytes())
+                total += len(y)
+                carry = np.concatenate([carry, y])
+                usable = len(carry) // FRAME * FRAME
+                rms.append(frame_rms(carry[:usable]))
+                carry = carry[usable:]
+            rec["audio_seconds"] = total / sr
+        rms = np.concatenate(rms) if rms else np.zeros(0)
+
+        # Pass 2: cut, peak-normalize and write each segment from the memory-mapped scratch file
+        outputs = []
+        with stage("long_segment", input_path, total / sr):
+            signal = np.memmap(scratch, dtype=np.float32, mode="r") if total else np.zeros(0, np.float32)
+            pad = int(SEGMENT_PAD_SECONDS * sr)
+            for i, (s, e) in enumerate(speech_segments(rms), 1):
+                segment = np.array(signal[max(0, s * FRAME - pad):min(total, e * FRAME + pad)])
+                peak = np.max(np.abs(segment))
+                if peak > 0:
+                    segment = segment / peak
+                segment = np.clip(segment, -1.0, 1.0)
+                output_path = os.path.join(output_dir, f"{stem}_seg{i:03d}.wav")
+                write(output_path, sr, segment.astype(np.float32))
+                outputs.append((output_path, s * FRAME / sr, e * FRAME / sr))
+            del signal
+    return outputs
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Denoise a long recording in blocks and split it into speech segments.")
+    parser.add_argument("input_path")
+    parser.add_argument("output_dir")
+    args = parser.parse_args()
+
+    for path, start, end in clean_long_file(args.input_path, args.output_dir):
+        print(f"✅ {start:8.2f}s - {end:8.2f}s → {path}")
@@ -0,0 +1,137 @@
+import os
+import hashlib
+import sqlite3
+import soundfile as sf
+
+# === CONFIG ===
+MANIFEST_PATH = "manifest.sqlite"
+AUDIO_EXTENSIONS = (".mp3", ".wav")
+HASH_CHUNK = 1 << 20  # 1 MiB
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path          TEXT PRIMARY KEY,
+    label         TEXT,
+    size          INTEGER,
+    mtime         REAL,
+    sha256        TEXT,
+    duration      REAL,
+    sample_rate   INTEGER,
+    channels      INTEGER,
+    duplicate_of  TEXT,
+    selected      INTEGER
+)
+"""
+
+def connect(db_path=MANIFEST_PATH):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    conn.execute(SCHEMA)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_files_sha256 ON files (sha256)")
+    return conn
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(block)
+    return h.hexdigest()
+
+# === Header-only metadata: no samples are decoded ===
+def read_header(path):
+    try:
+        info = sf.info(path)
+        return info.duration, info.samplerate, info.channels
+    except Exception:
+        # Containers libsndfile can't parse (e.g. AAC in .mp3) — audioread only
+        # probes the stream until the file is iterated
+        import audioread
+        with audioread.audio_open(path) as f:
+            return f.duration, f.samplerate, f.channels
+
+def scan(conn, base_path, labels=("lie", "truth")):
+    for label in labels:
+        folder = os.path.join(base_path, label)
+        if not os.path.isdir(folder):
+            continue
+        for file in sorted(os.listdir(folder)):
+            if not file.endswith(AUDIO_EXTENSIONS):
+                continue
+            path = os.path.join(folder, file)
+            stat = os.stat(path)
+            row = conn.execute("SELECT size, mtime FROM files WHERE path = ?", (path,)).fetchone()
+            if row is not None and row["size"] == stat.st_size and row["mtime"] == stat.st_mtime:
+                continue  # unchanged since last scan
+
+            try:
+                duration, sample_rate, channels = read_header(path)
+            except Exception as e:
+                print(f"⚠️ Could not read header of {path}: {e}")
+                duration, sample_rate, channels = None, None, None
+
+            conn.execute(
+                "INSERT OR REPLACE INTO files "
+                "(path, label, size, mtime, sha256, duration, sample_rate, channels, duplicate_of, selected) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL, NULL)",
+                (path, label, stat.st_size, stat.st_mtime, file_hash(path), duration, sample_rate, channels),
+            )
+
+    # Forget files that disappeared from disk
+    for row in conn.execute("SELECT path FROM files").fetchall():
+        if not os.path.exists(row["path"]):
+            conn.execute("DELETE FROM files WHERE path = ?", (row["path"],))
+
+    mark_duplicates(conn)
+    conn.commit()
+
+def mark_duplicates(conn):
+    # The shortest path for each content hash is canonical (so "t14 (2).mp3" loses
+    # to "t14.mp3"), the other copies point at it
+    conn.execute("UPDATE files SET duplicate_of = NULL")
+    conn.execute("""
+        UPDATE files SET duplicate_of = (
+            SELECT f2.path FROM files f2 WHERE f2.sha256 = files.sha256
+            ORDER BY length(f2.path), f2.path LIMIT 1
+        )
+    """)
+    conn.execute("UPDATE files SET duplicate_of = NULL WHERE duplicate_of = path")
+
+def files_under(conn, base_path, include_duplicates=False):
+    query = "SELECT * FROM files WHERE path LIKE ?"
+    if not include_duplicates:
+        query += " AND duplicate_of IS NULL"
+    return conn.execute(query + " ORDER BY path", (os.path.join(base_path, "") + "%",)).fetchall()
+
+def select_by_duration(conn, base_path, max_duration, long_mode=False):
+    # Record the selection instead of copying the files to another folder.
+    # long_mode keeps longer files too; cleaned.py segments them (longform.py)
+    selected, skipped = [], []
+    for row in files_under(conn, base_path, include_duplicates=True):
+        keep = (
+            row["duplicate_of"] is None
+            and row["duration"] is not None
+            and (long_mode or row["duration"] <= max_duration)
+        )
+        conn.execute("UPDATE files SET selected = ? WHERE path = ?", (int(keep), row["path"]))
+        (selected if keep else skipped).append(row)
+    conn.commit()
+    return selected, skipped
+
+def selected_files(conn, base_path=""):
+    return conn.execute(
+        "SELECT * FROM files WHERE selected = 1 AND path LIKE ? ORDER BY path",
+        (os.path.join(base_path, "") + "%" if base_path else "%",),
+    ).fetchall()
+
+if __name__ == "__main__":
+    import sys
+
+    base = sys.argv[1] if len(sys.argv) > 1 else "normalized_data"
+    conn = connect()
+    scan(conn, base)
+    for row in files_under(conn, base, include_duplicates=True):
+        dup = f" (duplicate of {row['duplicate_of']})" if row["duplicate_of"] else ""
+        if row["duration"] is None:
+            print(f"⚠️ {row['path']}: unreadable header")
+        else:
+            print(f"{row['path']}: {row['duration']:.2f}s, {row['sample_rate']} Hz, {row['channels']} ch{dup}")
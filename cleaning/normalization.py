@@ -1,20 +1,28 @@
-from pydub import AudioSegment
 import os
+import numpy as np
+from scipy.io.wavfile import write
 
-# ✅ Set full paths manually
-AudioSegment.converter = "C:/Users/Anukriti Chauhan/Downloads/ffmpeg-7.1.1-essentials_build/ffmpeg-7.1.1-essentials_build/bin/ffmpeg.exe"
-AudioSegment.ffprobe = "C:/Users/Anukriti Chauhan/Downloads/ffmpeg-7.1.1-essentials_build/ffmpeg-7.1.1-essentials_build/bin/ffprobe.exe"
-input_path = "../data/"  # go up one level to reach 'data' from 'cleaning'
+import rootpath  # repo root on sys.path, see rootpath.py
+import audioio
 
+# === Format normalization for the staged flow ===
+# normalization.py → filtered.py → cleaned.py. This step only converts the uploads to
+# mono 16 kHz WAV, with the same decode/downmix/resample as pipeline.py (audioio.load).
+# Amplitude (peak) normalization happens in exactly one place, cleaned.clean_signal,
+# used by both cleaned.py and pipeline.py.
+# pipeline.py does all three steps in one pass; this staged flow is kept for the
+# manifest (duplicate detection, duration selection) that filtered.py builds.
+input_path = "../data/"  # go up one level to reach 'data' from 'cleaning'
 output_path = "normalized_data/"
+SAMPLE_RATE = 16000
+AUDIO_EXTENSIONS = (".mp3", ".wav")
 
-os.makedirs(output_path + "lie", exist_ok=True)
-os.makedirs(output_path + "truth", exist_ok=True)
-
-for label in ["lie", "truth"]:
-    for file in os.listdir(input_path + label):
-        if file.endswith(".mp3") or file.endswith(".wav"):
-            sound = AudioSegment.from_file(input_path + label + "/" + file)
-            sound = sound.set_channels(1).set_frame_rate(16000)
-            output_file = output_path + label + "/" + file.split('.')[0] + ".wav"
-            sound.export(output_file, format="wav")
+if __name__ == "__main__":
+    for label in ["lie", "truth"]:
+        os.makedirs(output_path + label, exist_ok=True)
+        for file in sorted(os.listdir(input_path + label)):
+            if file.endswith(AUDIO_EXTENSIONS):
+                y, sr = audioio.load(input_path + label + "/" + file, sr=SAMPLE_RATE, mono=True)
+                output_file = output_path + label + "/" + file.split('.')[0] + ".wav"
+                write(output_file, sr, y.astype(np.float32))
+                print(f"✅ {label}/{file} → {output_file}")
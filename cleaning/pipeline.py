@@ -0,0 +1,93 @@
+import os
+import numpy as np
+from scipy.io.wavfile import write
+
+import rootpath  # repo root on sys.path, see rootpath.py
+from cleaned import clean_signal
+from filtered import MAX_DURATION
+import audioio
+
+# === CONFIG ===
+INPUT_DIR = "../data"          # raw uploads (mp3/wav), same as normalization.py
+OUTPUT_DIR = "cleaned_data"    # only the final cleaned copy is written
+SAMPLE_RATE = 16000
+AUDIO_EXTENSIONS = (".mp3", ".wav")
+LONG_MODE = False              # segment recordings over MAX_DURATION instead of skipping them
+
+# === Decode once, clean in memory, write once ===
+# Replaces normalization.py → filtered.py → cleaned.py, which each decoded the
+# whole corpus again and wrote a full intermediate copy to disk.
+# There is no manifest here: the duplicate check that filtered.py / cleaned.py get
+# from manifest.sqlite is redone per run from content hashes (same sha256 as the
+# manifest), so a re-upload of the same file is skipped, not cleaned twice. Files
+# cleaned by earlier runs are not compared against.
+def process_file(input_path, output_path, long_mode=LONG_MODE):
+    # Step 1: Duration check from the container header, before decoding
+    try:
+        duration = audioio.get_duration(input_path)
+    except Exception:
+        duration = None
+    # Returns (written files, duration); no files = skipped
+    if duration is not None and duration > MAX_DURATION:
+        if not long_mode:
+            return [], duration
+        # Block-wise denoise + speech segmentation, memory independent of length
+        import longform
+        stem = os.path.splitext(os.path.basename(output_path))[0]
+        segments = longform.clean_long_file(input_path, os.path.dirname(output_path), stem)
+        return [path for path, _, _ in segments], duration
+
+    # Step 2: Single decode with downmix + resample
+    y, sr = audioio.load(input_path, sr=SAMPLE_RATE, mono=True)
+    duration = len(y) / sr
+    if duration > MAX_DURATION:
+        return [], duration
+
+    # Step 3: Noise reduction, trim, peak normalization, clipping
+    y = clean_signal(y, sr)
+
+    write(output_path, SAMPLE_RATE, y.astype(np.float32))
+    return [output_path], duration
+
+def run_pipeline(input_dir=INPUT_DIR, output_dir=OUTPUT_DIR, long_mode=LONG_MODE):
+    seen = {}  # content sha256 -> first file with it
+    for label in ["lie", "truth"]:
+        input_folder = os.path.join(input_dir, label)
+        output_folder = os.path.join(output_dir, label)
+        os.makedirs(output_folder, exist_ok=True)
+
+        for file in sorted(os.listdir(input_folder)):
+            if not file.endswith(AUDIO_EXTENSIONS):
+                continue
+            input_path = os.path.join(input_folder, file)
+            output_path = os.path.join(output_folder, file.split('.')[0] + ".wav")
+            try:
+                digest = audioio.content_hash(input_path)
+                if digest in seen:
+                    print(f"❌ Skipped {file} - duplicate of {seen[digest]}")
+                    continue
+                seen[digest] = input_path
+                written, duration = process_file(input_path, output_path, long_mode)
+                if written == [output_path]:
+                    print(f"✅ Processed {file} - {duration:.2f}s → {output_path}")
+                elif written:
+                    print(f"✂️ Processed {file} - {duration:.2f}s → {len(written)} segments:")
+                    for path in written:
+                        print(f"   {path}")
+                elif long_mode and duration > MAX_DURATION:
+                    print(f"⚠️ No speech segments in {file} - {duration:.2f}s")
+                else:
+                    print(f"❌ Skipped {file} - {duration:.2f}s")
+            except Exception as e:
+                print(f"⚠️ Error processing {input_path}: {e}")
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Decode, filter and clean raw uploads in one pass.")
+    parser.add_argument("--input-dir", default=INPUT_DIR)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--long", action="store_true", default=LONG_MODE,
+                        help="split recordings over MAX_DURATION into speech segments instead of skipping them")
+    args = parser.parse_args()
+    run_pipeline(args.input_dir, args.output_dir, args.long)
@@ -0,0 +1,15 @@
+import os
+import sys
+
+# === Import paths for cleaning/ ===
+# The cleaning scripts run from inside cleaning/ (python cleaned.py) and import each
+# other flatly (import manifest), and they share instrument.py / audioio.py /
+# workers.py with the repo root. This is the one place that makes both importable,
+# however the scripts are started: cleaning/__init__.py runs it when the repo root
+# imports them as cleaning.cleaned, cleaning.longform, ...
+CLEANING_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(CLEANING_DIR)
+
+for path in (ROOT_DIR, CLEANING_DIR):
+    if path not in sys.path:
+        sys.path.append(path)
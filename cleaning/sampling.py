@@ -1,6 +1,6 @@
 import os
-import librosa
 import matplotlib.pyplot as plt
+import manifest
 
 # Set path to your folders
 base_path = "normalized_data/"
@@ -8,6 +8,10 @@ folders = ["lie", "truth"]
 
 sampling_rates = []
 
+# Sample rates come from the manifest (container headers), nothing is decoded
+conn = manifest.connect()
+manifest.scan(conn, base_path, labels=folders)
+
 for folder in folders:
     folder_path = os.path.join(base_path, folder)
     if not os.path.exists(folder_path):
@@ -15,15 +19,11 @@ for folder in folders:
         continue
 
     print(f"\n📁 Checking folder: {folder_path}")
-    for filename in os.listdir(folder_path):
-        if filename.endswith(".wav"):
-            file_path = os.path.join(folder_path, filename)
-            print(f"🔍 Reading: {file_path}")
-            try:
-                _, sr = librosa.load(file_path, sr=None)
-                sampling_rates.append(sr)
-            except Exception as e:
-                print(f"⚠️ Could not load {file_path}: {e}")
+    for row in manifest.files_under(conn, folder_path, include_duplicates=True):
+        if row["sample_rate"] is None:
+            print(f"⚠️ Could not read header of {row['path']}")
+        else:
+            sampling_rates.append(row["sample_rate"])
 
 # Summary
 print(f"\n✅ Total audio files checked: {len(sampling_rates)}")
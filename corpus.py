@@ -0,0 +1,116 @@
+import os
+import json
+import numpy as np
+
+# === Packed audio corpus ===
+# All cleaned clips back to back in one float32 <name>.npy (memory-mappable), plus
+# <name>.json with the sample rate and one {name, label, offset, length, source}
+# entry per clip. A clip is a zero-copy slice of the memmap: no open/decode/resample.
+CORPUS_DTYPE = np.float32
+SAMPLE_RATE = 16000
+LABELS = ["lie", "truth"]
+
+def _base(path):
+    root, ext = os.path.splitext(path)
+    return root if ext in (".npy", ".json") else path
+
+def corpus_exists(path):
+    base = _base(path)
+    return os.path.exists(base + ".npy") and os.path.exists(base + ".json")
+
+def list_clips(input_dir, labels=LABELS):
+    files = []
+    for label in labels:
+        folder = os.path.join(input_dir, label)
+        for file in sorted(os.listdir(folder)):
+            if file.endswith(".wav"):
+                files.append((os.path.join(folder, file), label))
+    return files
+
+def pack(files, path, sr=SAMPLE_RATE):
+    # files: [(wav path, label)] at `sr` (cleaned.py output); returns the clip count
+    import soundfile as sf
+
+    base = _base(path)
+    os.makedirs(os.path.dirname(base) or ".", exist_ok=True)
+    clips, offset = [], 0
+    for wav, label in files:
+        info = sf.info(wav)
+        if info.samplerate != sr:
+            raise ValueError(f"{wav}: {info.samplerate} Hz, corpus is {sr} Hz")
+        name = os.path.splitext(os.path.basename(wav))[0]
+        clips.append({"name": name, "label": label, "offset": offset, "length": info.frames, "source": wav})
+        offset += info.frames
+
+    # Size known from the headers, so samples are written straight into the memmap
+    data = np.lib.format.open_memmap(base + ".npy", mode="w+", dtype=CORPUS_DTYPE, shape=(offset,))
+    for clip in clips:
+        y, _ = sf.read(clip["source"], dtype="float32", always_2d=True)
+        data[clip["offset"]:clip["offset"] + clip["length"]] = y.mean(axis=1)[:clip["length"]]
+    data.flush()
+    del data
+
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump({"sample_rate": sr, "dtype": np.dtype(CORPUS_DTYPE).name, "samples": offset, "clips": clips}, f)
+    return len(clips)
+
+class Corpus:
+    def __init__(self, path):
+        base = _base(path)
+        with open(base + ".json", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.path = base
+        self.sample_rate = meta["sample_rate"]
+        self.clips = meta["clips"]
+        self.data = np.load(base + ".npy", mmap_mode="r")
+        self._by_name = {(c["label"], c["name"]): i for i, c in enumerate(self.clips)}
+
+    def __len__(self):
+        return len(self.clips)
+
+    def __iter__(self):
+        for i in range(len(self.clips)):
+            yield self.clips[i], self.clip(i)
+
+    def index(self, name, label=None):
+        if label is not None:
+            return self._by_name[(label, name)]
+        matches = [i for (l, n), i in self._by_name.items() if n == name]
+        if len(matches) != 1:
+            raise KeyError(f"{name!r}: {len(matches)} clips match, pass a label")
+        return matches[0]
+
+    def clip(self, i):
+        # Read-only view into the memmap; copy it if it has to be modified
+        c = self.clips[i]
+        return self.data[c["offset"]:c["offset"] + c["length"]]
+
+    def duration(self, i):
+        return self.clips[i]["length"] / self.sample_rate
+
+# One open corpus per process, for pool workers that get (path, index) jobs
+_open = {}
+
+def open_corpus(path):
+    base = _base(path)
+    if base not in _open:
+        _open[base] = Corpus(base)
+    return _open[base]
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pack cleaned clips into one memory-mapped corpus, or describe one.")
+    parser.add_argument("corpus", help="corpus name (without extension)")
+    parser.add_argument("--pack", metavar="INPUT_DIR", help="pack INPUT_DIR/{lie,truth}/*.wav")
+    args = parser.parse_args()
+
+    if args.pack:
+        n = pack(list_clips(args.pack), args.corpus)
+        print(f"✅ Packed {n} clips into '{_base(args.corpus)}.npy'")
+    corpus = Corpus(args.corpus)
+    total = sum(c["length"] for c in corpus.clips) / corpus.sample_rate
+    for label in LABELS:
+        count = sum(c["label"] == label for c in corpus.clips)
+        print(f"{label:6s}: {count} clips")
+    print(f"Total : {len(corpus)} clips, {total:.1f}s at {corpus.sample_rate} Hz")
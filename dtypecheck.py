@@ -0,0 +1,129 @@
+import sys
+import glob
+import argparse
+import numpy as np
+
+# === CONFIG ===
+# Runs every stage of the dtype policy (see audioio.py) in float32 and float64 on the
+# same input and checks that the float32 results stay within tolerance.
+SAMPLE_RATE = 16000
+INPUT_GLOB = "cleaning/cleaned_data/*/*.wav"
+MAX_FILES = 5
+SYNTHETIC_SECONDS = [1, 10, 60]
+NFFT = 512
+FRAME_LENGTH = 400   # 25 ms, as in mfcc.py
+FRAME_STEP = 160     # 10 ms
+NFILT = 40
+
+# Largest allowed float32-vs-float64 error per stage; measured errors are 10-100x below
+TOLERANCES = {
+    "clean": 1e-6,          # max abs sample difference (signal in [-1, 1])
+    "framing": 1e-6,        # max abs difference of pre-emphasized frames
+    "power": 1e-5,          # max abs difference / max power
+    "filterbank_db": 1e-3,  # max abs difference of log filterbank energies (dB)
+    "mfcc": 1e-4,           # max abs difference / max |MFCC|
+    "frame_table": 1e-4,    # worst column: max abs difference / max |column|
+    "aggregates": 1e-3,     # worst of the 12 refined features, relative
+    "score": 0.01,          # fuzzy score, absolute
+}
+
+# === Per-stage comparison of one signal ===
+def compare_signal(y, sr, pitch_method="pyin"):
+    import features
+    import scoring
+    from cleaning.cleaned import clean_signal
+
+    y = np.asarray(y, dtype=np.float64)
+    errors = {}
+
+    # Each stage gets the same float64 input, so errors don't compound across stages
+    c32, c64 = clean_signal(y, sr, np.float32), clean_signal(y, sr, np.float64)
+    if len(c32) != len(c64):
+        errors["clean"] = np.inf   # trimming decided differently
+    else:
+        errors["clean"] = float(np.abs(c32 - c64).max())
+    y = c64
+
+    _, fr32 = features.frame_signal(y, FRAME_LENGTH, FRAME_STEP, dtype=np.float32)
+    _, fr64 = features.frame_signal(y, FRAME_LENGTH, FRAME_STEP, dtype=np.float64)
+    errors["framing"] = float(np.abs(fr32 - fr64).max())
+
+    window = np.hamming(FRAME_LENGTH)
+    p32 = features.power_spectrum(fr64, NFFT, window, dtype=np.float32)
+    p64 = features.power_spectrum(fr64, NFFT, window, dtype=np.float64)
+    errors["power"] = float(np.abs(p32 - p64).max() / max(p64.max(), 1e-12))
+
+    fb32 = p64.astype(np.float32) @ features.mel_filterbank(sr, NFFT, NFILT, np.float32).T
+    fb64 = p64 @ features.mel_filterbank(sr, NFFT, NFILT, np.float64).T
+    floor = np.finfo(np.float32).eps   # same floor on both sides, it isn't under test
+    db32 = 20 * np.log10(np.maximum(fb32, floor))
+    db64 = 20 * np.log10(np.maximum(fb64, floor))
+    errors["filterbank_db"] = float(np.abs(db32 - db64).max())
+
+    m32 = features.mfcc(y, sr, dtype=np.float32)
+    m64 = features.mfcc(y, sr, dtype=np.float64)
+    errors["mfcc"] = float(np.abs(m32 - m64).max() / max(np.abs(m64).max(), 1e-12))
+
+    t32 = features.frame_table_from_signal(y, sr, pitch_method, np.float32)
+    t64 = features.frame_table_from_signal(y, sr, pitch_method, np.float64)
+    column_errors = (t32 - t64).abs().max() / t64.abs().max().clip(lower=1e-12)
+    errors["frame_table"] = float(column_errors.max())
+
+    pred32, score32, agg32 = scoring.score_frames(t32)
+    pred64, score64, agg64 = scoring.score_frames(t64)
+    agg32, agg64 = np.asarray(agg32, dtype=float), np.asarray(agg64, dtype=float)
+    errors["aggregates"] = float(np.nanmax(np.abs(agg32 - agg64) / np.maximum(np.abs(agg64), 1e-9)))
+    errors["score"] = float(abs(score32 - score64)) if pred32 == pred64 else np.inf
+
+    # Memory per frame table row, the point of the float32 path
+    errors["_bytes_per_frame"] = (t32.memory_usage(index=False).sum() / len(t32),
+                                  t64.memory_usage(index=False).sum() / len(t64))
+    return errors
+
+def check(results):
+    # results: {source: errors} -> list of (source, stage, error, tolerance) failures
+    failures = []
+    for source, errors in results.items():
+        for stage, tolerance in TOLERANCES.items():
+            if not errors[stage] <= tolerance:
+                failures.append((source, stage, errors[stage], tolerance))
+    return failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the float32 pipeline against float64 per stage.")
+    parser.add_argument("files", nargs="*", help=f"audio files (default: first {MAX_FILES} of {INPUT_GLOB})")
+    parser.add_argument("--pitch", default="pyin", help="pitch method for the frame tables (see pitch.py)")
+    parser.add_argument("--no-synthetic", action="store_true", help="skip the synthetic signals")
+    args = parser.parse_args()
+
+    import audioio
+    from benchmark import synthetic_speech
+
+    sources = {}
+    if not args.no_synthetic:
+        for seconds in SYNTHETIC_SECONDS:
+            sources[f"synthetic_{seconds}s"] = lambda seconds=seconds: synthetic_speech(seconds, SAMPLE_RATE)
+    for path in args.files or sorted(glob.glob(INPUT_GLOB))[:MAX_FILES]:
+        sources[path] = lambda path=path: audioio.load(path, sr=SAMPLE_RATE, dtype=np.float64)[0]
+
+    results = {}
+    for source, load in sources.items():
+        try:
+            results[source] = compare_signal(load(), SAMPLE_RATE, args.pitch)
+        except Exception as e:
+            print(f"⚠️ Skipped {source}: {e}")
+            continue
+        errors = results[source]
+        print(f"\n{source}  ({errors['_bytes_per_frame'][0]:.0f} vs {errors['_bytes_per_frame'][1]:.0f} bytes per frame row)")
+        for stage, tolerance in TOLERANCES.items():
+            mark = "✅" if errors[stage] <= tolerance else "❌"
+            print(f"  {mark} {stage:<14} {errors[stage]:.3g}  (tolerance {tolerance:g})")
+
+    failures = check(results)
+    if not results:
+        print("❌ Nothing to compare")
+        sys.exit(1)
+    if failures:
+        print(f"\n❌ {len(failures)} stage(s) out of tolerance")
+        sys.exit(1)
+    print(f"\n✅ float32 path within tolerance on {len(results)} inputs")
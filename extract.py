@@ -0,0 +1,116 @@
+import os
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import pandas as pd
+
+import features
+import featurestore
+import featurecache
+from workers import set_thread_env, limit_threads
+from scoring import refined_feature_names
+from fuzzy import predict_truth_or_lie_batch
+
+# === CONFIG ===
+INPUT_DIR = "cleaning/cleaned_data"   # folder with 'lie' and 'truth'
+OUTPUT_CSV = "features_dataset.csv"
+LABELS = ["lie", "truth"]
+
+def _init_worker(threads_per_worker):
+    # Headless workers; cap BLAS/FFT pools so the process pool doesn't oversubscribe
+    os.environ["MPLBACKEND"] = "Agg"
+    limit_threads(threads_per_worker)
+
+# === One file: decode once, aligned frame table, 12 aggregates ===
+# Both come from the feature cache (featurecache.py) when this audio was already
+# extracted with the same parameters; only the fuzzy scoring is redone every run.
+def extract_file(audio_path, label, frames_dir=None, pitch_method=features.PITCH_METHOD):
+    if frames_dir:
+        stem = os.path.splitext(os.path.basename(audio_path))[0]
+        os.makedirs(os.path.join(frames_dir, label), exist_ok=True)
+        featurestore.save_frames(featurecache.frame_table(audio_path, pitch_method),
+                                 os.path.join(frames_dir, label, stem))
+    n_frames, refined = featurecache.refined_features(audio_path, pitch_method)
+    return [audio_path, label, n_frames] + refined
+
+def extract_clip(corpus_path, index, frames_dir=None, pitch_method=features.PITCH_METHOD):
+    # Same as extract_file, on a zero-copy slice of a packed corpus (corpus.py)
+    import corpus
+
+    packed = corpus.open_corpus(corpus_path)
+    clip = packed.clips[index]
+    y = packed.clip(index)
+    if frames_dir:
+        os.makedirs(os.path.join(frames_dir, clip["label"]), exist_ok=True)
+        df = featurecache.frame_table_from_signal(y, packed.sample_rate, pitch_method, clip["source"])
+        featurestore.save_frames(df, os.path.join(frames_dir, clip["label"], clip["name"]))
+    n_frames, refined = featurecache.refined_features_from_signal(y, packed.sample_rate, pitch_method, clip["source"])
+    return [clip["source"], clip["label"], n_frames] + refined
+
+def list_files(input_dir=INPUT_DIR, labels=LABELS):
+    files = []
+    for label in labels:
+        folder = os.path.join(input_dir, label)
+        for file in sorted(os.listdir(folder)):
+            if file.endswith(".wav"):
+                files.append((os.path.join(folder, file), label))
+    return files
+
+def extract_dataset(files, workers=None, threads_per_worker=1, frames_dir=None,
+                    pitch_method=features.PITCH_METHOD, corpus_path=None):
+    # files: [(path, label)], or with corpus_path, clip indices into that corpus
+    workers = workers or os.cpu_count() or 1
+    rows, errors = [], []
+
+    set_thread_env(threads_per_worker)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(threads_per_worker,)) as pool:
+        if corpus_path:
+            futures = {
+                pool.submit(extract_clip, corpus_path, index, frames_dir, pitch_method): f"{corpus_path}[{index}]"
+                for index in files
+            }
+        else:
+            futures = {
+                pool.submit(extract_file, path, label, frames_dir, pitch_method): path
+                for path, label in files
+            }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                rows.append(future.result())
+                print(f"✅ {path}")
+            except Exception as e:
+                errors.append({"file": path, "error": f"{type(e).__name__}: {e}"})
+                print(f"⚠️ Failed {path}: {e}")
+
+    df = pd.DataFrame(rows, columns=["file", "label", "frames"] + refined_feature_names)
+    df = df.sort_values("file").reset_index(drop=True)
+    if len(df):
+        df["prediction"], df["score"] = predict_truth_or_lie_batch(df)
+    return df, errors
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract labelled features for every clip in cleaned_data/{lie,truth}.")
+    parser.add_argument("--input-dir", default=INPUT_DIR)
+    parser.add_argument("--output", default=OUTPUT_CSV)
+    parser.add_argument("--frames-dir", default=None, help="also keep each frame table in this frame-store folder")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: all cores)")
+    parser.add_argument("--threads-per-worker", type=int, default=1)
+    parser.add_argument("--pitch", default=features.PITCH_METHOD, help="pitch engine, see pitch.py")
+    parser.add_argument("--error-report", default="extract_errors.json")
+    parser.add_argument("--corpus", default=None, help="read clips from this packed corpus instead of --input-dir")
+    args = parser.parse_args()
+
+    if args.corpus:
+        import corpus
+        files = range(len(corpus.Corpus(args.corpus)))
+    else:
+        files = list_files(args.input_dir)
+    df, errors = extract_dataset(files, args.workers, args.threads_per_worker, args.frames_dir, args.pitch,
+                                 corpus_path=args.corpus)
+
+    df.to_csv(args.output, index=False)
+    with open(args.error_report, "w", encoding="utf-8") as f:
+        json.dump({"processed": len(df), "failed": errors}, f, indent=2)
+    print(f"Saved {len(df)} labelled rows to '{args.output}' ({len(errors)} failed)")
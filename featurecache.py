@@ -0,0 +1,206 @@
+import os
+import json
+import shutil
+import hashlib
+import functools
+import numpy as np
+
+import audioio
+import featurestore
+
+# === Persistent feature cache ===
+# <cache>/<audio sha256>/<params key>.npy/.json  frame table (featurestore format)
+# <cache>/<audio sha256>/<params key>.agg-<aggregate key>.json  the 12 refined features
+#
+# The params key hashes everything the frame table depends on: the extraction
+# parameters in features.py, the pipeline dtype, and a code version (the source of
+# features.py / pitch.py plus the librosa version). The aggregate key adds the source
+# of scoring.py. Changing any of these gives a new key, so stale entries are simply
+# never read again (--prune deletes them). fuzzy.py is not part of either key:
+# retuning the fuzzy thresholds re-scores the cached aggregates without touching audio.
+CACHE_DIR = os.environ.get("FEATURE_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".feature_cache"))
+CACHE_ENABLED = os.environ.get("FEATURE_CACHE", "1") not in ("0", "false")
+FRAME_CODE = ["features.py", "pitch.py"]
+AGGREGATE_CODE = ["scoring.py"]
+
+def _source_hash(files):
+    h = hashlib.sha256()
+    root = os.path.dirname(os.path.abspath(__file__))
+    for name in files:
+        with open(os.path.join(root, name), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()[:16]
+
+@functools.lru_cache(maxsize=None)
+def code_version():
+    return {"frames": f"{_source_hash(FRAME_CODE)}-librosa-{audioio._librosa_version()}",
+            "aggregates": _source_hash(AGGREGATE_CODE)}
+
+def extraction_params(pitch_method=None, sr=None):
+    import features
+    return {
+        "sample_rate": sr or features.SAMPLE_RATE,
+        "n_mfcc": features.N_MFCC,
+        "n_mels": features.MFCC_N_MELS,
+        "nfft": features.NFFT,
+        "frame_length": features.FRAME_LENGTH,
+        "hop_length": features.HOP_LENGTH,
+        "pitch_method": pitch_method or features.PITCH_METHOD,
+        "pitch_fmin": features.PITCH_FMIN,
+        "pitch_fmax": features.PITCH_FMAX,
+        "dtype": audioio.DTYPE.name,
+        "code": code_version()["frames"],
+    }
+
+def _key(params):
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+
+def signal_hash(y):
+    # Content hash for audio that has no file of its own (corpus clips, uploads)
+    return hashlib.sha256(np.ascontiguousarray(y, dtype=audioio.STORAGE_DTYPE).tobytes()).hexdigest()
+
+def _entry(audio_hash, params):
+    return os.path.join(CACHE_DIR, audio_hash, _key(params))
+
+# === Frame tables ===
+def _load_or_build(audio_hash, params, build, source):
+    base = _entry(audio_hash, params)
+    if CACHE_ENABLED and featurestore.store_exists(base):
+        # The store is one float32 matrix; give every column back the dtype it was
+        # built with (Frame is int64), so a hit looks exactly like a miss
+        with open(base + ".json", encoding="utf-8") as f:
+            dtypes = json.load(f).get("dtypes")
+        if dtypes is not None:   # entries from before dtypes were recorded are rebuilt
+            return featurestore.load_frames(base).astype(dtypes), True
+
+    df = build()
+    if CACHE_ENABLED:
+        # Written under a temporary name and renamed, .json last: a reader that sees
+        # the sidecar also sees a complete .npy
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        tmp = f"{base}.{os.getpid()}.tmp"
+        featurestore.save_frames(df, tmp)
+        with open(tmp + ".json", encoding="utf-8") as f:
+            meta = json.load(f)
+        meta.update(source=source, params=params,
+                    dtypes={column: df[column].dtype.name for column in meta["columns"]})
+        with open(tmp + ".json", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(tmp + ".npy", base + ".npy")
+        os.replace(tmp + ".json", base + ".json")
+    return df, False
+
+def frame_table(audio_path, pitch_method=None, sr=None):
+    # Cached features.extract_frame_table(audio_path, sr, pitch_method)
+    import features
+    params = extraction_params(pitch_method, sr)
+    df, _ = _load_or_build(
+        audioio.content_hash(audio_path), params,
+        lambda: features.extract_frame_table(audio_path, params["sample_rate"], params["pitch_method"]),
+        os.path.abspath(audio_path),
+    )
+    return df
+
+def frame_table_from_signal(y, sr, pitch_method=None, source=None):
+    # Cached features.frame_table_from_signal, keyed by the samples themselves
+    import features
+    params = extraction_params(pitch_method, sr)
+    df, _ = _load_or_build(
+        signal_hash(y), params,
+        lambda: features.frame_table_from_signal(y, sr, params["pitch_method"]),
+        source,
+    )
+    return df
+
+# === The 12 refined features ===
+def _refined(audio_hash, params, build_frames, source):
+    from scoring import refined_features_from_frames
+
+    path = f"{_entry(audio_hash, params)}.agg-{code_version()['aggregates']}.json"
+    if CACHE_ENABLED:
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            return entry["frames"], entry["features"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    df, _ = _load_or_build(audio_hash, params, build_frames, source)
+    refined = [float(v) for v in refined_features_from_frames(df)]
+    if CACHE_ENABLED:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"frames": len(df), "features": refined}, f)
+        os.replace(tmp, path)
+    return len(df), refined
+
+def refined_features(audio_path, pitch_method=None, sr=None):
+    # -> (frame count, 12 refined features); audio is only decoded on a miss of both
+    import features
+    params = extraction_params(pitch_method, sr)
+    return _refined(
+        audioio.content_hash(audio_path), params,
+        lambda: features.extract_frame_table(audio_path, params["sample_rate"], params["pitch_method"]),
+        os.path.abspath(audio_path),
+    )
+
+def refined_features_from_signal(y, sr, pitch_method=None, source=None):
+    import features
+    params = extraction_params(pitch_method, sr)
+    return _refined(
+        signal_hash(y), params,
+        lambda: features.frame_table_from_signal(y, sr, params["pitch_method"]),
+        source,
+    )
+
+# === Housekeeping ===
+def _entries():
+    # (audio hash, file name, size) of every cached file
+    if not os.path.isdir(CACHE_DIR):
+        return []
+    entries = []
+    for audio_hash in os.listdir(CACHE_DIR):
+        folder = os.path.join(CACHE_DIR, audio_hash)
+        if os.path.isdir(folder):
+            for name in os.listdir(folder):
+                entries.append((audio_hash, name, os.path.getsize(os.path.join(folder, name))))
+    return entries
+
+def prune(pitch_methods=None):
+    # Delete entries made with other parameters or older code than the current ones
+    import pitch
+    current = {_key(extraction_params(method)) for method in (pitch_methods or pitch.ENGINES)}
+    aggregates = f".agg-{code_version()['aggregates']}.json"
+    removed = 0
+    for audio_hash, name, _ in _entries():
+        key, _, rest = name.partition(".")
+        if key in current and (rest in ("npy", "json") or name.endswith(aggregates)):
+            continue
+        os.remove(os.path.join(CACHE_DIR, audio_hash, name))
+        removed += 1
+    return removed
+
+def clear():
+    removed = len(_entries())
+    shutil.rmtree(CACHE_DIR, ignore_errors=True)
+    return removed
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or clean the persistent feature cache.")
+    parser.add_argument("--prune", action="store_true", help="remove entries from other parameters or code versions")
+    parser.add_argument("--clear", action="store_true", help="remove every cached frame table and aggregate")
+    args = parser.parse_args()
+
+    if args.clear:
+        print(f"🧹 Removed {clear()} cached files from '{CACHE_DIR}'")
+    elif args.prune:
+        print(f"🧹 Removed {prune()} stale cached files from '{CACHE_DIR}'")
+    entries = _entries()
+    tables = sum(name.endswith(".npy") for _, name, _ in entries)
+    aggregates = sum(".agg-" in name for _, name, _ in entries)
+    total = sum(size for _, _, size in entries)
+    print(f"{CACHE_DIR}: {len({h for h, _, _ in entries})} clips, {tables} frame tables, "
+          f"{aggregates} aggregate sets, {total / 1024**2:.1f} MB")
+    print(f"Current parameters: {json.dumps(extraction_params(), sort_keys=True)}")
@@ -0,0 +1,187 @@
+import functools
+import librosa
+import numpy as np
+import audioio
+
+import pitch
+
+# === CONFIG ===
+CACHE_SIZE = 32      # distinct (sr, NFFT, nfilt, n_mfcc) combinations kept per process
+MFCC_N_MELS = 128    # mel bands behind the MFCCs, same as librosa.feature.mfcc's default
+# Arrays follow the dtype policy in audioio.py; every dtype=None below means audioio.DTYPE
+
+def _dtype(dtype):
+    return np.dtype(dtype or audioio.DTYPE)
+
+# === Mel filterbank (triangular, as in Step 6 of mfcc.py) ===
+def _triangular_filterbank(sr, n_fft, nfilt):
+    low_freq_mel = 0
+    high_freq_mel = 2595 * np.log10(1 + (sr / 2) / 700)
+    mel_points = np.linspace(low_freq_mel, high_freq_mel, nfilt + 2)
+    hz_points = 700 * (10**(mel_points / 2595) - 1)
+    bins = np.floor((n_fft + 1) * hz_points / sr)
+
+    k = np.arange(int(np.floor(n_fft / 2 + 1)))[None, :]
+    left, center, right = bins[:-2, None], bins[1:-1, None], bins[2:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rising = (k - left) / (center - left)
+        falling = (right - k) / (right - center)
+    fbank = np.where((k >= left) & (k < center), rising, 0.0)
+    fbank = np.where((k >= center) & (k < right), falling, fbank)
+    return fbank
+
+# === Orthonormal DCT-II basis, rows = cepstral coefficients ===
+def _dct_basis(n_in, n_out):
+    n = np.arange(n_in)[None, :]
+    k = np.arange(n_out)[:, None]
+    basis = np.sqrt(2.0 / n_in) * np.cos(np.pi * k * (2 * n + 1) / (2 * n_in))
+    basis[0] /= np.sqrt(2.0)
+    return basis
+
+def _read_only(array):
+    array.setflags(write=False)  # cached arrays are shared between callers
+    return array
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def mel_filterbank(sr, n_fft, nfilt, dtype=None):
+    # Built in float64, stored in the pipeline dtype so fbank products don't promote
+    return _read_only(_triangular_filterbank(sr, n_fft, nfilt).astype(_dtype(dtype)))
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def mfcc_bases(sr, n_fft, n_mels, n_mfcc, dtype=None):
+    # librosa's (slaney) mel basis + DCT, built once per process instead of once per file
+    mel_basis = librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels, dtype=_dtype(dtype))
+    return _read_only(mel_basis), _read_only(_dct_basis(n_mels, n_mfcc).astype(_dtype(dtype)))
+
+# === MFCC (same result as librosa.feature.mfcc, with cached bases) ===
+def mfcc_from_power(power_spec, sr, n_mfcc=13, n_fft=512, n_mels=MFCC_N_MELS, dtype=None):
+    # power_spec: (1 + n_fft // 2, frames) power spectrogram
+    mel_basis, dct = mfcc_bases(sr, n_fft, n_mels, n_mfcc, dtype)
+    log_mel = librosa.power_to_db(mel_basis @ np.asarray(power_spec, dtype=_dtype(dtype)))
+    return dct @ log_mel
+
+def mfcc(y, sr, n_mfcc=13, n_fft=512, hop_length=160, n_mels=MFCC_N_MELS, dtype=None):
+    y = np.asarray(y, dtype=_dtype(dtype))
+    power_spec = np.abs(librosa.stft(y, n_fft=n_fft, hop_length=hop_length, pad_mode="constant")) ** 2
+    return mfcc_from_power(power_spec, sr, n_mfcc, n_fft, n_mels, dtype)
+
+# === Framing without index matrices ===
+FRAME_BLOCK = 1024   # frames windowed + FFT'd per block in power_spectrum
+
+def num_frames_for(signal_length, frame_length, frame_step):
+    return int(np.ceil(float(np.abs(signal_length - frame_length)) / frame_step))
+
+def frame_signal(y, frame_length, frame_step, coeff=0.97, dtype=None):
+    # Pre-emphasis is written straight into the zero-padded buffer (the only copy
+    # of the signal); frames are a strided view into it, nothing is gathered.
+    signal_length = len(y)
+    num_frames = num_frames_for(signal_length, frame_length, frame_step)
+    pad_signal = np.zeros(num_frames * frame_step + frame_length, dtype=_dtype(dtype))
+
+    pad_signal[0] = y[0]
+    np.multiply(y[:-1], -coeff, out=pad_signal[1:signal_length], casting="unsafe")
+    pad_signal[1:signal_length] += y[1:]
+
+    frames = np.lib.stride_tricks.sliding_window_view(pad_signal, frame_length)[::frame_step][:num_frames]
+    return pad_signal, frames
+
+def power_spectrum(frames, n_fft, window, block=FRAME_BLOCK, dtype=None):
+    # |rfft(frames * window)|^2 / n_fft, computed block by block in preallocated
+    # buffers so the windowed frames never exist all at once
+    import scipy.fft
+
+    dtype = _dtype(dtype)
+    num_frames, frame_length = frames.shape
+    window = np.asarray(window, dtype=dtype)
+    pow_frames = np.empty((num_frames, n_fft // 2 + 1), dtype=dtype)
+    windowed = np.empty((min(block, num_frames), frame_length), dtype=dtype)
+
+    for start in range(0, num_frames, block):
+        chunk = frames[start:start + block]
+        buf = windowed[:len(chunk)]
+        np.multiply(chunk, window, out=buf)
+        spec = scipy.fft.rfft(buf, n_fft)
+        out = pow_frames[start:start + len(chunk)]
+        np.multiply(spec.real, spec.real, out=out)
+        out += spec.imag * spec.imag
+        out *= 1.0 / n_fft
+    return pow_frames
+
+# === MFCC frame table (Step 8 of mfcc.py) ===
+def mfcc_frame_table(mfcc, frame_stride, decimals=3):
+    # mfcc: (n_mfcc, frames). Built column-wise instead of one dict per frame;
+    # decimals=None keeps full precision.
+    import pandas as pd
+
+    n_frames = mfcc.shape[1]
+    times = np.arange(n_frames) * frame_stride
+    values = mfcc.T
+    if decimals is not None:
+        times = np.round(times, decimals)
+        values = np.round(values, decimals)
+
+    df = pd.DataFrame(values, columns=[f"MFCC_{i + 1}" for i in range(mfcc.shape[0])])
+    df.insert(0, "Time (s)", times)
+    df.insert(0, "Frame", np.arange(n_frames))
+    return df
+
+# === Single-STFT frame table ===
+# One decode and one STFT on a common 10 ms grid; every feature below is
+# centred on the same frames, so no re-alignment is needed downstream.
+SAMPLE_RATE = 16000
+N_MFCC = 13
+NFFT = 512
+HOP_LENGTH = 160      # 10 ms
+FRAME_LENGTH = 320    # 20 ms window for ZCR, RMS energy and pitch (as in otherpattern.py)
+PITCH_FMIN = 80
+PITCH_FMAX = 300
+PITCH_METHOD = "pyin"  # see pitch.ENGINES: pyin, yin, gated, segmented, segmented_windows
+
+def frame_table_from_signal(y, sr, pitch_method=PITCH_METHOD, dtype=None):
+    import pandas as pd
+
+    dtype = _dtype(dtype)
+    y = np.asarray(y, dtype=dtype)
+
+    # Spectral features: one STFT
+    S = np.abs(librosa.stft(y, n_fft=NFFT, hop_length=HOP_LENGTH, pad_mode="constant"))
+    mel_basis, dct = mfcc_bases(sr, NFFT, MFCC_N_MELS, N_MFCC, dtype)
+    log_mel = librosa.power_to_db(mel_basis @ S**2)
+    mfcc = dct @ log_mel
+    centroid = librosa.feature.spectral_centroid(S=S, sr=sr, n_fft=NFFT, hop_length=HOP_LENGTH)[0]
+    rolloff = librosa.feature.spectral_rolloff(S=S, sr=sr, n_fft=NFFT, hop_length=HOP_LENGTH)[0]
+    # Onset-strength flux from the same log-mel frames; S is already centred
+    flux = librosa.onset.onset_strength(S=log_mel, sr=sr, hop_length=HOP_LENGTH, center=False)
+
+    # Time-domain features on the same centred grid
+    zcr = librosa.feature.zero_crossing_rate(y, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH)[0]
+    energy = librosa.feature.rms(y=y, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH)[0]
+    f0, _ = pitch.estimate_pitch(
+        y, sr, method=pitch_method, fmin=PITCH_FMIN, fmax=PITCH_FMAX,
+        frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH
+    )
+
+    n_frames = mfcc.shape[1]
+    columns = {
+        "Frame": np.arange(n_frames),
+        "Time (s)": librosa.frames_to_time(np.arange(n_frames), sr=sr, hop_length=HOP_LENGTH),
+    }
+    for i in range(N_MFCC):
+        columns[f"MFCC_{i + 1}"] = mfcc[i]
+
+    # Same floors as otherpattern.py
+    columns["ZCR"] = np.maximum(zcr[:n_frames], 1e-6)
+    columns["Energy"] = np.maximum(energy[:n_frames], 1e-6)
+    columns["Pitch"] = np.where(np.isnan(f0[:n_frames]), PITCH_FMIN, f0[:n_frames])
+    columns["Spectral_Centroid"] = np.maximum(centroid, 1e-6)
+    columns["Spectral_Flux"] = np.maximum(flux, 1e-4)
+    columns["Spectral_Rolloff"] = rolloff
+    # pyin / frames_to_time / librosa's feature helpers may hand back float64
+    for name in columns:
+        if name != "Frame":
+            columns[name] = np.asarray(columns[name], dtype=dtype)
+    return pd.DataFrame(columns)
+
+def extract_frame_table(audio_path, sr=SAMPLE_RATE, pitch_method=PITCH_METHOD, dtype=None):
+    y, sr = audioio.load(audio_path, sr=sr, dtype=dtype)
+    return frame_table_from_signal(y, sr, pitch_method, dtype)
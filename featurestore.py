@@ -0,0 +1,69 @@
+import os
+import json
+import numpy as np
+
+# === Binary frame-feature store ===
+# A frame table is saved as <name>.npy (one float32 matrix, frames x columns,
+# memory-mappable) plus <name>.json holding the column names.
+# Excel is only written on request, as a report.
+STORE_DTYPE = np.float32
+
+def _base(path):
+    root, ext = os.path.splitext(path)
+    return root if ext in (".npy", ".json") else path
+
+def store_exists(path):
+    base = _base(path)
+    return os.path.exists(base + ".npy") and os.path.exists(base + ".json")
+
+def save_frames(df, path, columns=None):
+    base = _base(path)
+    if columns is None:
+        # DataFrame: keep its numeric columns in order
+        df = df.select_dtypes(include=[np.number])
+        columns = list(df.columns)
+        data = df.to_numpy(dtype=STORE_DTYPE)
+    else:
+        data = np.asarray(df, dtype=STORE_DTYPE)
+    if data.ndim != 2 or data.shape[1] != len(columns):
+        raise ValueError(f"expected a (frames, {len(columns)}) table, got shape {data.shape}")
+
+    np.save(base + ".npy", np.ascontiguousarray(data))
+    with open(base + ".json", "w", encoding="utf-8") as f:
+        json.dump({"columns": list(columns), "rows": int(data.shape[0]), "dtype": np.dtype(STORE_DTYPE).name}, f)
+    return base + ".npy"
+
+def load_frame_array(path, mmap=True):
+    base = _base(path)
+    with open(base + ".json", encoding="utf-8") as f:
+        meta = json.load(f)
+    data = np.load(base + ".npy", mmap_mode="r" if mmap else None)
+    return data, meta["columns"]
+
+def load_frames(path, mmap=True):
+    import pandas as pd
+
+    data, columns = load_frame_array(path, mmap=mmap)
+    return pd.DataFrame(data, columns=columns, copy=False)
+
+def read_frames(path):
+    # Accepts either a store path or a legacy .xlsx frame table
+    if path.endswith(".xlsx"):
+        import pandas as pd
+        return pd.read_excel(path)
+    return load_frames(path)
+
+def export_excel(path, xlsx_path=None):
+    xlsx_path = xlsx_path or _base(path) + ".xlsx"
+    load_frames(path, mmap=False).to_excel(xlsx_path, index=False)
+    return xlsx_path
+
+if __name__ == "__main__":
+    import sys
+
+    # Convert existing Excel frame tables: python featurestore.py ft13.xlsx t1of13.xlsx ...
+    import pandas as pd
+
+    for xlsx in sys.argv[1:]:
+        out = save_frames(pd.read_excel(xlsx), os.path.splitext(xlsx)[0])
+        print(f"✅ Converted '{xlsx}' → '{out}'")
@@ -1,9 +1,60 @@
+import os
+import json
+import numpy as np
+
+FEATURE_NAMES = [
+    "pause_count", "longest_pause", "pause_rate", "pitch_jump_count", "pitch_range",
+    "pitch_skewness", "pitch_std", "mfcc13_microstress", "flux_spikes", "energy_range",
+    "pitch_entropy", "spectral_rolloff"
+]
+
+# Weights for features reflecting their importance
+WEIGHTS = {
+    "pause_count": 8,        # Increased weight for pause_count
+    "longest_pause": 6,
+    "pause_rate": 6,
+    "pitch_jump_count": 5,
+    "pitch_range": 5,
+    "pitch_skewness": 4,
+    "pitch_std": 5,
+    "mfcc13_microstress": 5,
+    "flux_spikes": 4,
+    "energy_range": 4,
+    "pitch_entropy": 4,
+    "spectral_rolloff": 4
+}
+
+# (low, mid, high) breakpoints of each fuzzy_range membership
+BREAKPOINTS = {
+    # Pause features: lower is better (more truthful)
+    "pause_count": (0, 10, 30),
+    "longest_pause": (0, 0.02, 0.12),
+    "pause_rate": (0, 7, 15),
+    # Pitch-related features: mid-range or moderate-high values favored
+    "pitch_jump_count": (10, 25, 50),
+    "pitch_range": (40, 90, 150),
+    "pitch_std": (40, 80, 140),
+    # Microstress and spectral flux (moderate values better)
+    "mfcc13_microstress": (25, 40, 60),
+    "flux_spikes": (20, 50, 90),
+    "energy_range": (0.1, 0.4, 0.8),
+    # Spectral entropy and rolloff: mid-range better
+    "pitch_entropy": (0.8, 1.4, 1.8),
+    "spectral_rolloff": (3000, 4800, 7600),
+}
+
+# Pitch skewness: full weight inside the plateau, linear penalty around the centre outside it
+SKEW_PLATEAU = (0.5, 1.2)
+SKEW_CENTER = 0.85
+SKEW_SPREAD = 2
+
+# Lowered threshold to 46% for better truth capture
+TRUTH_THRESHOLD = 46
+
+SKEW_INDEX = FEATURE_NAMES.index("pitch_skewness")
+
 def predict_truth_or_lie_from_features(features):
-    feature_names = [
-        "pause_count", "longest_pause", "pause_rate", "pitch_jump_count", "pitch_range",
-        "pitch_skewness", "pitch_std", "mfcc13_microstress", "flux_spikes", "energy_range",
-        "pitch_entropy", "spectral_rolloff"
-    ]
+    feature_names = FEATURE_NAMES
 
     # Convert list to dict if needed
     if isinstance(features, (list, tuple)):
@@ -21,57 +72,98 @@ def predict_truth_or_lie_from_features(features):
         else:
             return 0
 
-    # Weights for features reflecting their importance
-    weights = {
-        "pause_count": 8,        # Increased weight for pause_count
-        "longest_pause": 6,
-        "pause_rate": 6,
-        "pitch_jump_count": 5,
-        "pitch_range": 5,
-        "pitch_skewness": 4,
-        "pitch_std": 5,
-        "mfcc13_microstress": 5,
-        "flux_spikes": 4,
-        "energy_range": 4,
-        "pitch_entropy": 4,
-        "spectral_rolloff": 4
-    }
+    weights = WEIGHTS
 
     score = 0
 
-    # Pause features: lower is better (more truthful)
-    score += fuzzy_range(features["pause_count"], 0, 10, 30, weights["pause_count"])
-    score += fuzzy_range(features["longest_pause"], 0, 0.02, 0.12, weights["longest_pause"])
-    score += fuzzy_range(features["pause_rate"], 0, 7, 15, weights["pause_rate"])
+    for name in feature_names:
+        if name == "pitch_skewness":
+            # Pitch skewness: full weight if between 0.5 and 1.2, else linearly decreasing
+            skew = features[name]
+            if SKEW_PLATEAU[0] <= skew <= SKEW_PLATEAU[1]:
+                score += weights[name]
+            else:
+                # Linear penalty for skew outside [0.5, 1.2]
+                penalty = max(0, 1 - abs(skew - SKEW_CENTER) / SKEW_SPREAD)
+                score += weights[name] * penalty
+        else:
+            low, mid, high = BREAKPOINTS[name]
+            score += fuzzy_range(features[name], low, mid, high, weights[name])
 
-    # Pitch-related features: mid-range or moderate-high values favored
-    score += fuzzy_range(features["pitch_jump_count"], 10, 25, 50, weights["pitch_jump_count"])
-    score += fuzzy_range(features["pitch_range"], 40, 90, 150, weights["pitch_range"])
+    total_weight = sum(weights.values())
+    truth_score = (score / total_weight) * 100
 
-    # Pitch skewness: full weight if between 0.5 and 1.2, else linearly decreasing
-    skew = features["pitch_skewness"]
-    if 0.5 <= skew <= 1.2:
-        score += weights["pitch_skewness"]
-    else:
-        # Linear penalty for skew outside [0.5, 1.2]
-        penalty = max(0, 1 - abs(skew - 0.85) / 2)
-        score += weights["pitch_skewness"] * penalty
+    prediction = "Truth" if truth_score >= TRUTH_THRESHOLD else "Lie"
 
-    score += fuzzy_range(features["pitch_std"], 40, 80, 140, weights["pitch_std"])
+    return prediction, round(truth_score, 2)
 
-    # Microstress and spectral flux (moderate values better)
-    score += fuzzy_range(features["mfcc13_microstress"], 25, 40, 60, weights["mfcc13_microstress"])
-    score += fuzzy_range(features["flux_spikes"], 20, 50, 90, weights["flux_spikes"])
-    score += fuzzy_range(features["energy_range"], 0.1, 0.4, 0.8, weights["energy_range"])
+# === Vectorized scoring ===
+def breakpoint_arrays(breakpoints=None):
+    # (12,) low/mid/high arrays in FEATURE_NAMES order; pitch_skewness has no triangle
+    breakpoints = BREAKPOINTS if breakpoints is None else breakpoints
+    table = np.array([breakpoints.get(name, (np.nan, np.nan, np.nan)) for name in FEATURE_NAMES], dtype=float)
+    return table[:, 0], table[:, 1], table[:, 2]
 
-    # Spectral entropy and rolloff: mid-range better
-    score += fuzzy_range(features["pitch_entropy"], 0.8, 1.4, 1.8, weights["pitch_entropy"])
-    score += fuzzy_range(features["spectral_rolloff"], 3000, 4800, 7600, weights["spectral_rolloff"])
+def weight_array(weights=None):
+    weights = WEIGHTS if weights is None else weights
+    return np.array([weights[name] for name in FEATURE_NAMES], dtype=float)
 
-    total_weight = sum(weights.values())
-    truth_score = (score / total_weight) * 100
+def fuzzy_memberships(X, lows, mids, highs):
+    # Array form of fuzzy_range without the weight; NaN inputs score 0 like the scalar version
+    X = np.asarray(X, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rising = (mids - X) / (mids - lows)
+        falling = (highs - X) / (highs - mids)
+        return np.select(
+            [X <= lows, X >= highs, X < mids, X < highs],
+            [1.0, 0.0, rising, falling],
+            default=0.0,
+        )
 
-    # Lowered threshold to 48% for better truth capture
-    prediction = "Truth" if truth_score >= 46 else "Lie"
+def skew_membership(skew):
+    skew = np.asarray(skew, dtype=float)
+    inside = (skew >= SKEW_PLATEAU[0]) & (skew <= SKEW_PLATEAU[1])
+    penalty = np.fmax(0.0, 1 - np.abs(skew - SKEW_CENTER) / SKEW_SPREAD)
+    return np.where(inside, 1.0, penalty)
 
-    return prediction, round(truth_score, 2)
+def truth_scores(X, weights=None, lows=None, mids=None, highs=None):
+    # X: (..., N, 12). weights/lows/mids/highs broadcast against it, so a stack of
+    # candidate configurations shaped (K, 1, 12) yields (K, N) scores in one pass.
+    X = np.asarray(X, dtype=float)
+    weights = weight_array() if weights is None else np.asarray(weights, dtype=float)
+    if lows is None or mids is None or highs is None:
+        lows, mids, highs = breakpoint_arrays()
+
+    memberships = fuzzy_memberships(X, lows, mids, highs)
+    memberships[..., SKEW_INDEX] = skew_membership(X[..., SKEW_INDEX])
+
+    score = np.sum(memberships * weights, axis=-1)
+    return score / np.sum(weights, axis=-1) * 100
+
+def as_feature_matrix(features):
+    if hasattr(features, "columns"):
+        # DataFrame with the refined_feature_names columns
+        return features[FEATURE_NAMES].to_numpy(dtype=float)
+    X = np.atleast_2d(np.asarray(features, dtype=float))
+    if X.ndim != 2 or X.shape[1] != len(FEATURE_NAMES):
+        raise ValueError(f"expected an (N, {len(FEATURE_NAMES)}) feature matrix, got shape {X.shape}")
+    return X
+
+def predict_truth_or_lie_batch(features):
+    scores = truth_scores(as_feature_matrix(features))
+    predictions = np.where(scores >= TRUTH_THRESHOLD, "Truth", "Lie")
+    return predictions, np.round(scores, 2)
+
+# === Calibrated configurations (see calibrate.py) ===
+def load_config(path):
+    global TRUTH_THRESHOLD
+
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    WEIGHTS.update({name: float(w) for name, w in config.get("weights", {}).items()})
+    BREAKPOINTS.update({name: tuple(float(v) for v in bp) for name, bp in config.get("breakpoints", {}).items()})
+    TRUTH_THRESHOLD = float(config.get("threshold", TRUTH_THRESHOLD))
+    return config
+
+if os.environ.get("FUZZY_CONFIG"):
+    load_config(os.environ["FUZZY_CONFIG"])
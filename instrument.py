@@ -0,0 +1,179 @@
+import os
+import sys
+import json
+import time
+import heapq
+import argparse
+import functools
+import contextlib
+from collections import deque
+
+# === CONFIG (environment, so process-pool workers pick it up too) ===
+DEFAULT_LOG = "instrument_log.jsonl"                             # INSTRUMENT_LOG=1 writes here (git-ignored)
+LOG_PATH = os.environ.get("INSTRUMENT_LOG")                     # JSON-lines file, one record per stage
+if LOG_PATH in ("1", "true"):
+    LOG_PATH = DEFAULT_LOG
+PROFILE_TOP = int(os.environ.get("INSTRUMENT_PROFILE", "0"))    # keep profiles of the N slowest files
+PROFILE_DIR = os.environ.get("INSTRUMENT_PROFILE_DIR", "profiles")
+MAX_RECORDS = 10000                                             # in-memory history per process
+
+RECORDS = deque(maxlen=MAX_RECORDS)
+_stack = []     # records of the stages currently open in this process
+_slowest = []   # min-heap of (seconds, profile base path) for this process
+
+def peak_rss_mb():
+    # Process high-water mark; never goes down, so it bounds every stage run so far
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        return None
+
+def _emit(record):
+    RECORDS.append(record)
+    if LOG_PATH:
+        # One short append per record, so pool workers can share the file
+        with open(LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+
+def _keep_profile(record, profiler, snapshot):
+    # Dump cProfile + tracemalloc stats if this file is among the N slowest seen
+    seconds = record["seconds"]
+    if len(_slowest) >= PROFILE_TOP and seconds <= _slowest[0][0]:
+        return
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(record["file"]))[0]
+    base = os.path.join(PROFILE_DIR, f"{record['stage']}-{stem}-{os.getpid()}")
+    profiler.dump_stats(base + ".prof")
+    with open(base + ".mem.txt", "w", encoding="utf-8") as f:
+        f.write(f"{record['file']}  {seconds:.3f}s\n")
+        for stat in snapshot.statistics("lineno")[:25]:
+            f.write(f"{stat}\n")
+    heapq.heappush(_slowest, (seconds, base))
+    if len(_slowest) > PROFILE_TOP:
+        _, evicted = heapq.heappop(_slowest)
+        for ext in (".prof", ".mem.txt"):
+            with contextlib.suppress(OSError):
+                os.remove(evicted + ext)
+    record["profile"] = base + ".prof"
+
+# === Stage timer ===
+@contextlib.contextmanager
+def stage(name, file=None, audio_seconds=None):
+    # Usage: with stage("mfcc", path) as rec: ...; rec["audio_seconds"] = len(y) / sr
+    record = {"stage": name, "file": file, "audio_seconds": audio_seconds}
+    profile = PROFILE_TOP > 0 and file is not None and not _stack
+    if profile:
+        import cProfile
+        import tracemalloc
+        tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    _stack.append(record)
+    start = time.perf_counter()
+    status = "ok"
+    try:
+        yield record
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        _stack.pop()
+        audio = record.get("audio_seconds")
+        if _stack and audio and not _stack[-1].get("audio_seconds"):
+            # An inner stage found the audio length (e.g. after decoding); share it upwards
+            _stack[-1]["audio_seconds"] = audio
+        record.update({
+            "time": time.time(),
+            "pid": os.getpid(),
+            "seconds": seconds,
+            "rtf": seconds / audio if audio else None,
+            "peak_rss_mb": peak_rss_mb(),
+            "status": status,
+        })
+        if profile:
+            profiler.disable()
+            snapshot = tracemalloc.take_snapshot()
+            record["py_peak_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            tracemalloc.stop()
+            _keep_profile(record, profiler, snapshot)
+        _emit(record)
+
+def timed(name=None):
+    # Decorator form; a str first argument is taken as the file being processed
+    def decorate(func):
+        stage_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            file = args[0] if args and isinstance(args[0], str) else None
+            with stage(stage_name, file):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+# === Reports from a JSON-lines log ===
+def read_log(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def summarize(records):
+    totals = {}
+    for r in records:
+        t = totals.setdefault(r["stage"], {"calls": 0, "errors": 0, "seconds": 0.0,
+                                           "audio_seconds": 0.0, "peak_rss_mb": 0.0})
+        t["calls"] += 1
+        t["errors"] += r["status"] != "ok"
+        t["seconds"] += r["seconds"]
+        t["audio_seconds"] += r.get("audio_seconds") or 0.0
+        t["peak_rss_mb"] = max(t["peak_rss_mb"], r.get("peak_rss_mb") or 0.0)
+    return totals
+
+def prometheus(records, prefix="liedetector"):
+    # Prometheus text exposition format, one series per stage
+    totals = summarize(records)
+    lines = []
+    for metric, kind, key, scale in [
+        ("stage_calls_total", "counter", "calls", 1),
+        ("stage_errors_total", "counter", "errors", 1),
+        ("stage_seconds_total", "counter", "seconds", 1),
+        ("stage_audio_seconds_total", "counter", "audio_seconds", 1),
+        ("stage_peak_rss_bytes", "gauge", "peak_rss_mb", 1024 * 1024),
+    ]:
+        lines.append(f"# TYPE {prefix}_{metric} {kind}")
+        for name, t in sorted(totals.items()):
+            lines.append(f'{prefix}_{metric}{{stage="{name}"}} {t[key] * scale:.12g}')
+    return "\n".join(lines) + "\n"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize an INSTRUMENT_LOG file.")
+    parser.add_argument("log", nargs="?", default=DEFAULT_LOG,
+                        help=f"JSON-lines log written with INSTRUMENT_LOG=<path> (INSTRUMENT_LOG=1: {DEFAULT_LOG})")
+    parser.add_argument("--prometheus", metavar="PATH", help="write Prometheus text metrics to PATH ('-' for stdout)")
+    parser.add_argument("--slowest", type=int, default=10, help="list the N slowest file-level records")
+    args = parser.parse_args()
+
+    records = read_log(args.log)
+    if args.prometheus:
+        text = prometheus(records)
+        if args.prometheus == "-":
+            sys.stdout.write(text)
+        else:
+            with open(args.prometheus, "w", encoding="utf-8") as f:
+                f.write(text)
+            print(f"✅ Metrics written to '{args.prometheus}'")
+
+    print(f"{'stage':24s} {'calls':>6s} {'seconds':>10s} {'audio s':>10s} {'RTF':>7s} {'peak MB':>8s}")
+    for name, t in sorted(summarize(records).items(), key=lambda item: -item[1]["seconds"]):
+        rtf = t["seconds"] / t["audio_seconds"] if t["audio_seconds"] else float("nan")
+        print(f"{name:24s} {t['calls']:6d} {t['seconds']:10.3f} {t['audio_seconds']:10.1f} "
+              f"{rtf:7.3f} {t['peak_rss_mb']:8.1f}")
+
+    slow = sorted((r for r in records if r.get("file")), key=lambda r: -r["seconds"])[:args.slowest]
+    if slow:
+        print("\nSlowest files:")
+        for r in slow:
+            print(f"  {r['seconds']:8.3f}s  {r['stage']:16s} {r['file']}")
@@ -1,33 +1,45 @@
+import argparse
 import librosa
 import numpy as np
 import pandas as pd
+import audioio
+import featurestore
+import pitch
+from instrument import stage
 
-# Path to your audio file
+# Default audio file and frame-store name for the CLI
 file_path = "cleaning/cleaned_data/truth/t13.wav"
 output_name = "t1"
 
 # Frame and hop size for 10ms hop at 16kHz
 frame_length = 320  # ~20 ms
 hop_length = 160    # ~10 ms
+EXPORT_EXCEL = False  # optional .xlsx report next to the frame store
+PITCH_METHOD = "pyin"  # see pitch.ENGINES: "pyin", "yin", "gated", "segmented", "segmented_windows"
 
-def extract_framewise_features(file_path, output_name):
-    y, sr = librosa.load(file_path, sr=None)
+def framewise_features(file_path, pitch_method=PITCH_METHOD):
+    with stage("decode", file_path) as rec:
+        y, sr = audioio.load(file_path, sr=None)
+        rec["audio_seconds"] = audio_seconds = len(y) / sr
 
     # Extract raw features
-    zcr = librosa.feature.zero_crossing_rate(y, frame_length=frame_length, hop_length=hop_length)[0]
-    energy = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
-    centroid = librosa.feature.spectral_centroid(y=y, sr=sr, n_fft=frame_length, hop_length=hop_length)[0]
-    flux = librosa.onset.onset_strength(y=y, sr=sr, hop_length=hop_length)
-
-    # Pitch extraction using pYIN
-    f0, voiced_flag, voiced_probs = librosa.pyin(
-        y,
-        fmin=80,
-        fmax=300,
-        sr=sr,
-        frame_length=frame_length,
-        hop_length=hop_length
-    )
+    with stage("spectral_features", file_path, audio_seconds):
+        zcr = librosa.feature.zero_crossing_rate(y, frame_length=frame_length, hop_length=hop_length)[0]
+        energy = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
+        centroid = librosa.feature.spectral_centroid(y=y, sr=sr, n_fft=frame_length, hop_length=hop_length)[0]
+        flux = librosa.onset.onset_strength(y=y, sr=sr, hop_length=hop_length)
+
+    # Pitch extraction: full pYIN by default, "yin" / "gated" for fast bulk scoring
+    with stage(f"pitch_{pitch_method}", file_path, audio_seconds):
+        f0, voiced_flag = pitch.estimate_pitch(
+            y,
+            sr,
+            method=pitch_method,
+            fmin=80,
+            fmax=300,
+            frame_length=frame_length,
+            hop_length=hop_length
+        )
 
     # --- Corrections for Accuracy ---
 
@@ -63,10 +75,44 @@ def extract_framewise_features(file_path, output_name):
     df = pd.DataFrame(features, columns=["ZCR", "Energy", "Pitch", "Spectral_Centroid", "Spectral_Flux"])
     df["Time (s)"] = times
 
-    # Save
-    output_file = f"{output_name}of13.xlsx"
-    df.to_excel(output_file, index=False)
-    print(f"✅ Saved enhanced features to '{output_file}'")
+    return df
+
+def plot_features(df, columns=1500):
+    import matplotlib.pyplot as plt
+    from waveform import decimate
+
+    names = ["ZCR", "Energy", "Pitch", "Spectral_Centroid", "Spectral_Flux"]
+    plt.figure(figsize=(15, 12))
+    for i, name in enumerate(names, 1):
+        plt.subplot(len(names), 1, i)
+        plt.plot(*decimate(df["Time (s)"], df[name], columns=columns), label=name)
+        plt.title(f"{name} over Time")
+        plt.xlabel("Time (s)")
+        plt.ylabel(name)
+        plt.grid(True)
+        plt.legend()
+    plt.tight_layout()
+    plt.show()
+
+def extract_framewise_features(file_path, output_name, pitch_method=PITCH_METHOD, suffix="of13", plot=False):
+    with stage("framewise_file", file_path):
+        df = framewise_features(file_path, pitch_method)
+
+        # Save
+        output_file = f"{output_name}{suffix}"
+        featurestore.save_frames(df, output_file)
+    print(f"✅ Saved enhanced features to '{output_file}.npy'")
+    if EXPORT_EXCEL:
+        df.to_excel(f"{output_file}.xlsx", index=False)
+    if plot:
+        plot_features(df)
 
 # Run it
-extract_framewise_features(file_path, output_name)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-frame ZCR / energy / pitch / spectral table for one audio file.")
+    parser.add_argument("audio_path", nargs="?", default=file_path)
+    parser.add_argument("--output", default=output_name, help="frame-store name prefix (saved as <output>of13)")
+    parser.add_argument("--pitch", default=PITCH_METHOD, help="pitch engine, see pitch.py")
+    parser.add_argument("--no-plot", action="store_true")
+    args = parser.parse_args()
+    extract_framewise_features(args.audio_path, args.output, args.pitch, plot=not args.no_plot)
@@ -0,0 +1,186 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import librosa
+import numpy as np
+import audioio
+from workers import in_pool_worker
+
+# === CONFIG ===
+PITCH_FMIN = 80
+PITCH_FMAX = 300
+FRAME_LENGTH = 320  # ~20 ms
+HOP_LENGTH = 160    # ~10 ms
+VOICED_TOP_DB = 30      # energy gate: frames within 30 dB of the loudest frame may be voiced
+GATE_MARGIN = 10        # frames of context kept around each voiced run for pYIN
+GATE_MERGE_GAP = 50     # silent gaps shorter than this (frames) don't split a pYIN call
+SEGMENT_MAX_FRAMES = 3000   # longest piece (30 s at a 10 ms hop) handed to one worker
+SEGMENT_OVERLAP = 25        # frames of overlap on each side of a window, discarded when stitching
+PITCH_WORKERS = None        # process pool size for "segmented" (default: all cores, 1 inside a pool worker)
+GROSS_ERROR_CENTS = 50  # pitch error counted as gross above half a semitone
+
+# === Energy gate ===
+def energy_gate(y, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH, top_db=VOICED_TOP_DB):
+    rms = librosa.feature.rms(y=y, frame_length=frame_length, hop_length=hop_length)[0]
+    return librosa.amplitude_to_db(rms, ref=np.max) > -top_db
+
+def _runs(mask):
+    # (start, end) frame indices of every run of True values, end exclusive
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+def _merge_runs(starts, ends, max_gap):
+    # Each pYIN call has a fixed cost, so bridge short gaps between voiced runs
+    if len(starts) == 0:
+        return starts, ends
+    keep = np.concatenate(([True], starts[1:] - ends[:-1] > max_gap))
+    return starts[keep], ends[np.concatenate((keep[1:], [True]))]
+
+# === Engines; each returns (f0, voiced_flag) on the centred hop grid, f0 NaN when unvoiced ===
+def pitch_pyin(y, sr, fmin=PITCH_FMIN, fmax=PITCH_FMAX, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH):
+    f0, voiced_flag, _ = librosa.pyin(
+        y, fmin=fmin, fmax=fmax, sr=sr, frame_length=frame_length, hop_length=hop_length
+    )
+    return f0, voiced_flag
+
+def pitch_yin(y, sr, fmin=PITCH_FMIN, fmax=PITCH_FMAX, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH):
+    # Vectorized YIN (no HMM decoding); voicing comes from the energy gate
+    f0 = librosa.yin(y, fmin=fmin, fmax=fmax, sr=sr, frame_length=frame_length, hop_length=hop_length)
+    voiced_flag = energy_gate(y, frame_length, hop_length)[:len(f0)]
+    return np.where(voiced_flag, f0, np.nan), voiced_flag
+
+def pyin_on_segments(y, sr, segments, n_frames, fmin=PITCH_FMIN, fmax=PITCH_FMAX,
+                     frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH, margin=GATE_MARGIN,
+                     executor=None):
+    # Run pYIN on frame ranges [start, end) only and place the results on the full grid;
+    # with an executor the segments run in parallel
+    f0 = np.full(n_frames, np.nan)
+    voiced_flag = np.zeros(n_frames, dtype=bool)
+
+    tasks = []
+    for start, end in segments:
+        lo, hi = max(0, start - margin), min(n_frames, end + margin)
+        tasks.append((start, end, lo, y[lo * hop_length:hi * hop_length]))
+
+    args = [(seg, sr, fmin, fmax, frame_length, hop_length) for _, _, _, seg in tasks]
+    if executor is None:
+        results = [pitch_pyin(*a) for a in args]
+    else:
+        results = executor.map(pitch_pyin, *zip(*args)) if args else []
+
+    for (start, end, lo, _), (seg_f0, seg_voiced) in zip(tasks, results):
+        # Local frame j of the segment is centred on global frame lo + j
+        keep = slice(start - lo, start - lo + (end - start))
+        f0[start:end] = seg_f0[keep]
+        voiced_flag[start:end] = seg_voiced[keep]
+    return f0, voiced_flag
+
+def pitch_gated(y, sr, fmin=PITCH_FMIN, fmax=PITCH_FMAX, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH):
+    # pYIN only where the energy gate says there is speech; silent frames stay NaN
+    gate = energy_gate(y, frame_length, hop_length)
+    starts, ends = _merge_runs(*_runs(gate), GATE_MERGE_GAP)
+    f0, voiced_flag = pyin_on_segments(y, sr, zip(starts, ends), len(gate), fmin, fmax, frame_length, hop_length)
+    # Frames inside bridged gaps are still silent
+    return np.where(gate, f0, np.nan), voiced_flag & gate
+
+# === Segmented pYIN for long recordings ===
+def _split_long(starts, ends, max_frames):
+    pieces = []
+    for start, end in zip(starts, ends):
+        for piece_start in range(start, end, max_frames):
+            pieces.append((piece_start, min(end, piece_start + max_frames)))
+    return pieces
+
+def plan_segments(y, n_frames, split="silence", frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH,
+                  max_frames=SEGMENT_MAX_FRAMES, gate=None):
+    # "silence": cut at silent gaps (gate: precomputed energy_gate), then cap each piece at max_frames
+    # "windows": fixed windows over the whole signal
+    if split == "silence":
+        if gate is None:
+            gate = energy_gate(y, frame_length, hop_length)[:n_frames]
+        starts, ends = _merge_runs(*_runs(gate), GATE_MERGE_GAP)
+    elif split == "windows":
+        starts, ends = np.array([0]), np.array([n_frames])
+    else:
+        raise ValueError(f"Unknown split mode '{split}', expected 'silence' or 'windows'")
+    return _split_long(starts, ends, max_frames)
+
+def pitch_segmented(y, sr, fmin=PITCH_FMIN, fmax=PITCH_FMAX, frame_length=FRAME_LENGTH,
+                    hop_length=HOP_LENGTH, split="silence", workers=PITCH_WORKERS):
+    # Full pYIN accuracy per segment, segments spread over a process pool and stitched
+    # back onto the global hop grid (overlap frames are computed but discarded)
+    n_frames = 1 + len(y) // hop_length
+    # One energy gate, used both to plan the segments and to blank silent frames
+    gate = energy_gate(y, frame_length, hop_length)[:n_frames] if split == "silence" else None
+    segments = plan_segments(y, n_frames, split, frame_length, hop_length, gate=gate)
+    # Fan out only from a top-level process; inside extract.py / service.py pool
+    # workers the outer pool already uses every core
+    default_workers = 1 if in_pool_worker() else os.cpu_count() or 1
+    workers = min(workers or default_workers, max(1, len(segments)))
+
+    if workers == 1:
+        f0, voiced_flag = pyin_on_segments(y, sr, segments, n_frames, fmin, fmax, frame_length,
+                                           hop_length, margin=SEGMENT_OVERLAP)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            f0, voiced_flag = pyin_on_segments(y, sr, segments, n_frames, fmin, fmax, frame_length,
+                                               hop_length, margin=SEGMENT_OVERLAP, executor=pool)
+    if gate is not None:
+        f0, voiced_flag = np.where(gate, f0, np.nan), voiced_flag & gate
+    return f0, voiced_flag
+
+def pitch_segmented_windows(y, sr, fmin=PITCH_FMIN, fmax=PITCH_FMAX, frame_length=FRAME_LENGTH,
+                            hop_length=HOP_LENGTH, workers=PITCH_WORKERS):
+    # Segmented pYIN over fixed windows, no silence gating (every frame gets a pitch)
+    return pitch_segmented(y, sr, fmin, fmax, frame_length, hop_length, split="windows", workers=workers)
+
+ENGINES = {"pyin": pitch_pyin, "yin": pitch_yin, "gated": pitch_gated, "segmented": pitch_segmented,
+           "segmented_windows": pitch_segmented_windows}
+
+def estimate_pitch(y, sr, method="pyin", fmin=PITCH_FMIN, fmax=PITCH_FMAX,
+                   frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH, **options):
+    # options go to the engine as is, e.g. workers= for the segmented ones
+    if method not in ENGINES:
+        raise ValueError(f"Unknown pitch method '{method}', expected one of {sorted(ENGINES)}")
+    return ENGINES[method](y, sr, fmin, fmax, frame_length, hop_length, **options)
+
+# === Accuracy / speed against full pYIN ===
+def compare_pitch(y, sr, method, **kwargs):
+    start = time.perf_counter()
+    ref_f0, ref_voiced = pitch_pyin(y, sr, **kwargs)
+    ref_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    f0, voiced = estimate_pitch(y, sr, method, **kwargs)
+    method_time = time.perf_counter() - start
+
+    n = min(len(ref_f0), len(f0))
+    ref_f0, ref_voiced, f0, voiced = ref_f0[:n], ref_voiced[:n], f0[:n], voiced[:n]
+    both = ref_voiced & voiced & ~np.isnan(ref_f0) & ~np.isnan(f0)
+    cents = np.abs(1200 * np.log2(f0[both] / ref_f0[both])) if both.any() else np.array([])
+
+    return {
+        "method": method,
+        "frames": n,
+        "pyin_seconds": ref_time,
+        "method_seconds": method_time,
+        "speedup": ref_time / method_time if method_time > 0 else float("inf"),
+        "voicing_agreement": float(np.mean(voiced == ref_voiced)) if n else 1.0,
+        "gross_error_rate": float(np.mean(cents > GROSS_ERROR_CENTS)) if cents.size else 0.0,
+        "mean_abs_cents": float(np.mean(cents)) if cents.size else 0.0,
+        "mean_abs_hz": float(np.mean(np.abs(f0[both] - ref_f0[both]))) if both.any() else 0.0,
+    }
+
+if __name__ == "__main__":
+    import sys
+
+    audio_path = sys.argv[1] if len(sys.argv) > 1 else "cleaning/cleaned_data/truth/t13.wav"
+    methods = sys.argv[2:] or ["yin", "gated"]
+
+    y, sr = audioio.load(audio_path, sr=None)
+    for method in methods:
+        report = compare_pitch(y, sr, method)
+        print(f"\n{method} vs pyin on {audio_path}")
+        for key, value in report.items():
+            if key != "method":
+                print(f"{key:20s}: {value:.4f}" if isinstance(value, float) else f"{key:20s}: {value}")
@@ -1,5 +1,6 @@
 import pandas as pd
 import matplotlib.pyplot as plt
+from waveform import decimate
 
 # Load the MFCC data
 df = pd.read_excel("features_lie4.xlsx")
@@ -8,6 +9,7 @@ df = pd.read_excel("features_lie4.xlsx")
 total_time = df["Time (s)"].max()
 
 # Create subplots (4 rows x 4 columns)
+SUBPLOT_COLUMNS = 500  # ~pixel width of one subplot
 fig, axes = plt.subplots(4, 4, figsize=(18, 12))
 fig.suptitle('Individual MFCC Coefficients Over Time', fontsize=18)
 
@@ -16,7 +18,8 @@ for i in range(1, 14):
     row = (i - 1) // 4
     col = (i - 1) % 4
     ax = axes[row, col]
-    ax.plot(df["Time (s)"], df[f"MFCC_{i}"], color='red')
+    # Min/max envelope per pixel column instead of every frame
+    ax.plot(*decimate(df["Time (s)"], df[f"MFCC_{i}"], columns=SUBPLOT_COLUMNS), color='red')
     ax.set_title(f"MFCC_{i}", fontsize=11)
     ax.set_xlim(0, total_time)
     ax.set_xlabel("Time (s)")
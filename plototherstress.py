@@ -1,5 +1,6 @@
 import pandas as pd
 import matplotlib.pyplot as plt
+from waveform import decimate
 
 # Load your Excel file here
 excel_file = "l2_featurest2_10ms.xlsx"  # change if filename is different
@@ -8,13 +9,15 @@ df = pd.read_excel(excel_file)
 # Features to plot
 features = ["ZCR", "Energy", "Pitch", "Spectral_Centroid", "Spectral_Flux"]
 time = df["Time (s)"]
+PLOT_COLUMNS = 1500  # ~pixel width of one subplot
 
 # Plot setup
 plt.figure(figsize=(15, 12))
 
 for i, feature in enumerate(features, 1):
     plt.subplot(len(features), 1, i)
-    plt.plot(time, df[feature], label=feature)
+    # Min/max envelope per pixel column instead of every frame
+    plt.plot(*decimate(time, df[feature], columns=PLOT_COLUMNS), label=feature)
     plt.title(f"{feature} over Time")
     plt.xlabel("Time (s)")
     plt.ylabel(feature)
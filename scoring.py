@@ -0,0 +1,156 @@
+import numpy as np
+from fuzzy import predict_truth_or_lie_from_features, predict_truth_or_lie_batch
+
+# Scoring-only import path: NumPy + fuzzy.py, nothing else at import time.
+# librosa / pandas / scipy are only pulled in by the extraction helpers below.
+
+FRAME_DURATION = 0.01  # 10 ms hop
+
+# (ZCR, energy) upper thresholds of each pause tier: "pause" frames are counted for
+# pause_count / pause_rate, the stricter "silent" runs give longest_pause
+PAUSE_TIERS = {
+    "pause": (0.05, 0.01),
+    "silent": (0.02, 0.005),
+}
+
+refined_feature_names = [
+    "pause_count", "longest_pause", "pause_rate", "pitch_jump_count",
+    "pitch_range", "pitch_skewness", "pitch_std", "mfcc13_microstress", "flux_spikes",
+    "energy_range", "pitch_entropy", "spectral_rolloff"
+]
+
+# === NumPy versions of scipy.stats.skew / entropy (same results) ===
+def skew(a):
+    # Biased sample skewness; NaN for (numerically) constant input, as scipy
+    a = np.asarray(a, dtype=float)
+    mean = a.mean()
+    d = a - mean
+    m2 = np.mean(d**2)
+    m3 = np.mean(d**3)
+    if m2 <= (np.finfo(a.dtype).resolution * mean) ** 2:
+        return np.nan
+    return m3 / m2**1.5
+
+def entropy(pk):
+    # Shannon entropy (nats) of an unnormalized distribution
+    pk = np.asarray(pk, dtype=float)
+    pk = pk / pk.sum()
+    return -np.sum(np.where(pk > 0, pk * np.log(np.where(pk > 0, pk, 1)), 0.0))
+
+# === Run-length pause index ===
+def pause_segments(mask, frame_duration=FRAME_DURATION):
+    # All runs of True frames as start/end times (s), durations (s) and lengths (frames)
+    edges = np.diff(np.concatenate(([0], np.asarray(mask, dtype=np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return {
+        "start": starts * frame_duration,
+        "end": ends * frame_duration,
+        "duration": (ends - starts) * frame_duration,
+        "frames": ends - starts,
+    }
+
+def pause_index(zcr, energy, frame_duration=FRAME_DURATION):
+    zcr = np.asarray(zcr)
+    energy = np.asarray(energy)
+    return {
+        tier: pause_segments((zcr < zcr_max) & (energy < energy_max), frame_duration)
+        for tier, (zcr_max, energy_max) in PAUSE_TIERS.items()
+    }
+
+# === The 12 behavioral aggregates ===
+def refined_features_from_frames(df):
+    # df: DataFrame or dict of per-frame arrays (ZCR, Energy, Pitch, Spectral_*, MFCC_1..13)
+    # Extract individual features
+    # Frame tables may be float32 (see audioio.py); aggregates are always float64
+    zcr = np.asarray(df['ZCR'], dtype=np.float64)
+    energy = np.asarray(df['Energy'], dtype=np.float64)
+    pitch = np.asarray(df['Pitch'], dtype=np.float64)
+    flux = np.asarray(df['Spectral_Flux'], dtype=np.float64)
+    centroid = np.asarray(df['Spectral_Centroid'], dtype=np.float64)
+
+    mfcc_columns = [np.asarray(df[f'MFCC_{i}'], dtype=np.float64) for i in range(1, 14)]
+    mfcc13 = mfcc_columns[-1]
+
+    frame_duration_sec = FRAME_DURATION
+    duration = len(zcr) * frame_duration_sec
+
+    # Pause features, from the run-length pause index
+    pauses = pause_index(zcr, energy, frame_duration_sec)
+    pause_count = int(np.sum(pauses["pause"]["frames"]))
+    silent_runs = pauses["silent"]["frames"]
+    longest_pause = (int(silent_runs.max()) if len(silent_runs) else 0) * frame_duration_sec
+
+    pause_rate = pause_count / duration if duration > 0 else 0
+
+    # Clean pitch
+    pitch = pitch[~np.isnan(pitch)]
+    if len(pitch) < 2:
+        pitch_jump_count = 0
+        pitch_range = 0
+        pitch_skewness = 0
+        pitch_std = 0
+    else:
+        # Adaptive pitch analysis
+        valid_pitch = pitch[pitch > 100]
+        if len(valid_pitch) > 0:
+            pitch_range = np.max(valid_pitch) - np.min(valid_pitch)
+            pitch_skewness = skew(valid_pitch)
+        else:
+            pitch_range = 0
+            pitch_skewness = 0
+
+        pitch_diff = np.abs(np.diff(pitch))
+        jump_threshold = np.percentile(pitch_diff, 90)
+        pitch_jump_count = np.sum(pitch_diff > jump_threshold)
+        pitch_std = np.std(pitch)
+
+    # MFCC microstress: mean of all MFCC std deviations
+    mfcc_microstress = np.mean([np.std(mfcc) for mfcc in mfcc_columns])
+
+    # Spectral flux spikes
+    flux_spike_threshold = np.percentile(flux, 75)
+    flux_spikes = np.sum(flux > flux_spike_threshold)
+
+    # Energy range
+    energy_range = np.max(energy) - np.min(energy)
+
+    # Pitch entropy
+    if pitch is None or len(pitch) == 0 or np.isnan(pitch).all():
+        pitch_entropy = 0.0
+    else:
+        clean_pitch = pitch[~np.isnan(pitch)]
+        if len(clean_pitch) == 0:
+            pitch_entropy = 0.0
+        else:
+            hist, _ = np.histogram(clean_pitch, bins=20, density=True)
+            pitch_entropy = entropy(hist + 1e-6)
+
+    # Spectral rolloff (95th percentile)
+    spectral_rolloff = np.percentile(centroid, 95)
+
+    return [
+        pause_count, longest_pause, pause_rate, pitch_jump_count,
+        pitch_range, pitch_skewness, pitch_std, mfcc_microstress, flux_spikes,
+        energy_range, pitch_entropy, spectral_rolloff
+    ]
+
+def score_frames(df):
+    # Frame table (DataFrame / dict of arrays) -> (prediction, score, 12 features)
+    features = refined_features_from_frames(df)
+    prediction, score = predict_truth_or_lie_from_features(features)
+    return prediction, score, features
+
+def score_store(name):
+    # Frame-store table written by extract.py --frames-dir / features.py
+    import featurestore
+    data, columns = featurestore.load_frame_array(name)
+    return score_frames({col: data[:, i] for i, col in enumerate(columns)})
+
+def score_audio(audio_path, pitch_method=None):
+    # Full extraction (this is where librosa gets imported), unless the feature
+    # cache already holds this audio's aggregates; the fuzzy score is always fresh
+    import featurecache
+    _, features = featurecache.refined_features(audio_path, pitch_method)
+    prediction, score = predict_truth_or_lie_from_features(features)
+    return prediction, score, features
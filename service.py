@@ -0,0 +1,254 @@
+import os
+import io
+import json
+import time
+import asyncio
+import argparse
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import ProcessPoolExecutor
+
+from scoring import refined_feature_names
+from workers import set_thread_env, limit_threads
+
+# === CONFIG ===
+HOST = "127.0.0.1"
+PORT = 8765
+SAMPLE_RATE = 16000
+WORKERS = None            # process pool size (default: all cores)
+MAX_PENDING = 32          # requests queued or running before new ones get 503
+BATCH_WINDOW = 0.02       # seconds to wait for more requests before dispatching a batch
+MAX_BATCH = 8
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+PITCH_METHOD = "pyin"
+
+# === Worker side: warm state lives for the life of the process ===
+_warm = {}
+
+def _init_worker(threads_per_worker):
+    os.environ["MPLBACKEND"] = "Agg"
+    limit_threads(threads_per_worker)
+
+    import numpy as np
+    import librosa
+    import features
+    import scoring
+    import audioio
+    from cleaning.cleaned import clean_signal
+
+    # Build the cached filterbank/DCT and JIT-compile librosa's numba kernels once
+    warmup = (0.1 * np.sin(2 * np.pi * 150 * np.arange(SAMPLE_RATE) / SAMPLE_RATE)).astype(np.float32)
+    features.frame_table_from_signal(warmup, SAMPLE_RATE, PITCH_METHOD)
+    _warm.update(np=np, librosa=librosa, features=features, scoring=scoring, audioio=audioio,
+                 clean_signal=clean_signal)
+
+def _decode(item):
+    librosa, np = _warm["librosa"], _warm["np"]
+    if item.get("path"):
+        y, _ = _warm["audioio"].load(item["path"], sr=SAMPLE_RATE)
+        return y
+    import soundfile as sf
+    y, sr = sf.read(io.BytesIO(item["audio"]), dtype="float32", always_2d=True)
+    y = y.mean(axis=1)
+    if sr != SAMPLE_RATE:
+        y = librosa.resample(y, orig_sr=sr, target_sr=SAMPLE_RATE)
+    return np.ascontiguousarray(y)
+
+def _predict_one(item):
+    start = time.perf_counter()
+    y = _decode(item)
+    audio_seconds = len(y) / SAMPLE_RATE
+    if item.get("clean", True):
+        y = _warm["clean_signal"](y, SAMPLE_RATE)
+    df = _warm["features"].frame_table_from_signal(y, SAMPLE_RATE, item.get("pitch") or PITCH_METHOD)
+    prediction, score, refined = _warm["scoring"].score_frames(df)
+    return {
+        "prediction": prediction,
+        "score": float(score),
+        "features": {name: float(v) for name, v in zip(refined_feature_names, refined)},
+        "audio_seconds": audio_seconds,
+        "processing_seconds": time.perf_counter() - start,
+    }
+
+def predict_batch(items):
+    # One pool task per micro-batch; a bad file only fails its own entry
+    results = []
+    for item in items:
+        try:
+            results.append(_predict_one(item))
+        except Exception as e:
+            results.append({"error": f"{type(e).__name__}: {e}"})
+    return results
+
+# === Server side ===
+class Service:
+    def __init__(self, workers=WORKERS, threads_per_worker=1, max_pending=MAX_PENDING,
+                 batch_window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.workers = workers or os.cpu_count() or 1
+        set_thread_env(threads_per_worker)
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                        initargs=(threads_per_worker,))
+        self.max_pending = max_pending
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.queue = None
+        self.pending = 0
+        self.started = time.time()
+        self.metrics = {"requests": 0, "errors": 0, "rejected": 0, "batches": 0,
+                        "batched_items": 0, "audio_seconds": 0.0, "latency_seconds": 0.0}
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        # Start every worker (and its warm-up) now, not on the first request
+        await asyncio.gather(*[loop.run_in_executor(self.pool, predict_batch, [])
+                               for _ in range(self.workers)])
+        self._batcher = asyncio.create_task(self._batch_loop())
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self.metrics["batches"] += 1
+            self.metrics["batched_items"] += len(batch)
+            # Spread the batch over the pool: one chunk per worker at most
+            n_chunks = min(self.workers, len(batch))
+            for i in range(n_chunks):
+                chunk = batch[i::n_chunks]
+                task = loop.run_in_executor(self.pool, predict_batch, [item for item, _ in chunk])
+                task.add_done_callback(lambda t, chunk=chunk: self._resolve(t, chunk))
+
+    @staticmethod
+    def _resolve(task, chunk):
+        try:
+            results = task.result()
+        except Exception as e:
+            results = [{"error": f"{type(e).__name__}: {e}"}] * len(chunk)
+        for (_, future), result in zip(chunk, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def predict(self, item):
+        if self.pending >= self.max_pending:
+            self.metrics["rejected"] += 1
+            return None
+        self.pending += 1
+        start = time.perf_counter()
+        try:
+            future = asyncio.get_running_loop().create_future()
+            await self.queue.put((item, future))
+            result = await future
+        finally:
+            self.pending -= 1
+        self.metrics["requests"] += 1
+        self.metrics["latency_seconds"] += time.perf_counter() - start
+        if "error" in result:
+            self.metrics["errors"] += 1
+        else:
+            self.metrics["audio_seconds"] += result["audio_seconds"]
+        return result
+
+    def health(self):
+        return {"status": "ok", "workers": self.workers, "pending": self.pending,
+                "max_pending": self.max_pending, "uptime_seconds": time.time() - self.started}
+
+    def prometheus(self, prefix="liedetector_service"):
+        lines = []
+        for name, value in self.metrics.items():
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {value:.12g}")
+        lines.append(f"# TYPE {prefix}_pending gauge")
+        lines.append(f"{prefix}_pending {self.pending}")
+        return "\n".join(lines) + "\n"
+
+    # --- minimal HTTP/1.1, one request per connection ---
+    async def handle(self, reader, writer):
+        try:
+            status, body, content_type = await self._route(reader)
+        except Exception as e:
+            status, body, content_type = 400, {"error": f"{type(e).__name__}: {e}"}, "application/json"
+        if content_type == "application/json":
+            body = json.dumps(body)
+        data = body.encode("utf-8")
+        headers = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}",
+                   f"Content-Type: {content_type}", f"Content-Length: {len(data)}", "Connection: close"]
+        if status == 503:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _route(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        method, target, _ = request_line.split(" ", 2)
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            key, _, value = line.partition(":")
+            headers[key.strip().lower()] = value.strip()
+
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if method == "GET" and url.path == "/health":
+            return 200, self.health(), "application/json"
+        if method == "GET" and url.path == "/metrics":
+            return 200, self.prometheus(), "text/plain; version=0.0.4"
+        if method != "POST" or url.path != "/predict":
+            return 404, {"error": "use POST /predict, GET /health or GET /metrics"}, "application/json"
+
+        length = int(headers.get("content-length", 0))
+        if length > MAX_UPLOAD_BYTES:
+            return 413, {"error": f"upload larger than {MAX_UPLOAD_BYTES} bytes"}, "application/json"
+        payload = await reader.readexactly(length) if length else b""
+
+        # JSON {"path": ...} for files the service can read, anything else is an audio upload
+        if headers.get("content-type", "").startswith("application/json"):
+            item = json.loads(payload)
+        else:
+            item = {"audio": payload}
+        item.setdefault("clean", query.get("clean", "1") not in ("0", "false"))
+        item.setdefault("pitch", query.get("pitch"))
+        if not item.get("path") and not item.get("audio"):
+            return 400, {"error": "send an audio file body or JSON {\"path\": ...}"}, "application/json"
+
+        result = await self.predict(item)
+        if result is None:
+            return 503, {"error": "busy, retry later"}, "application/json"
+        return (500 if "error" in result else 200), result, "application/json"
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+                500: "Internal Server Error", 503: "Service Unavailable"}
+
+async def serve(host=HOST, port=PORT, **kwargs):
+    service = Service(**kwargs)
+    await service.start()
+    server = await asyncio.start_server(service.handle, host, port)
+    print(f"✅ Listening on http://{host}:{port} ({service.workers} workers)", flush=True)
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local truth/lie scoring service (POST /predict).")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WORKERS, help="process pool size (default: all cores)")
+    parser.add_argument("--threads-per-worker", type=int, default=1)
+    parser.add_argument("--max-pending", type=int, default=MAX_PENDING, help="backpressure limit")
+    parser.add_argument("--batch-window", type=float, default=BATCH_WINDOW)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    args = parser.parse_args()
+
+    asyncio.run(serve(args.host, args.port, workers=args.workers, threads_per_worker=args.threads_per_worker,
+                      max_pending=args.max_pending, batch_window=args.batch_window, max_batch=args.max_batch))
@@ -0,0 +1,232 @@
+import sys
+import socket
+import argparse
+import numpy as np
+
+import features
+from scoring import refined_features_from_frames
+from fuzzy import predict_truth_or_lie_from_features
+
+# === CONFIG ===
+SAMPLE_RATE = 16000
+NFFT = 512
+HOP_LENGTH = 160          # 10 ms, same grid as the offline frame tables
+FRAME_LENGTH = 320        # ZCR / RMS / pitch window, centred inside each NFFT frame
+N_MFCC = 13
+WINDOW_SECONDS = 30.0     # rolling window the truth score is computed over
+UPDATE_SECONDS = 1.0      # emit a score after this much new audio
+PITCH_FMIN = 80
+PITCH_FMAX = 300
+PITCH_METHOD = "pyin"     # "pyin" (run per update block) or "yin" (faster, energy-gated)
+VOICED_TOP_DB = 30        # yin voicing gate relative to the loudest frame in the window
+TOP_DB = 80               # log-mel floor below the running peak, as librosa.power_to_db
+CHUNK_BYTES = 3200        # 100 ms of 16-bit mono PCM at 16 kHz
+
+FRAME_COLUMNS = (
+    [f"MFCC_{i + 1}" for i in range(N_MFCC)]
+    + ["ZCR", "Energy", "Pitch", "Spectral_Centroid", "Spectral_Flux"]
+)
+
+# === Rolling scorer ===
+# Incoming samples are buffered until UPDATE_SECONDS of new frames are available,
+# framed in one block (only the last NFFT - HOP_LENGTH samples are carried over),
+# and the per-frame features go into a fixed-size ring buffer. The dataanalysis
+# aggregates + fuzzy score are then recomputed over that window, so memory and
+# per-update cost stay constant however long the call, and latency is bounded by
+# UPDATE_SECONDS plus one block of processing.
+class StreamingScorer:
+    def __init__(self, sr=SAMPLE_RATE, window_seconds=WINDOW_SECONDS, update_seconds=UPDATE_SECONDS,
+                 pitch_method=PITCH_METHOD):
+        import librosa
+
+        self._librosa = librosa
+        self.sr = sr
+        self.capacity = int(window_seconds * sr / HOP_LENGTH)
+        self.update_frames = max(1, int(update_seconds * sr / HOP_LENGTH))
+
+        self._carry = np.zeros(0, dtype=np.float32)
+        self._ring = np.zeros((self.capacity, len(FRAME_COLUMNS)), dtype=np.float32)
+        self._head = 0            # next row to write
+        self._filled = 0
+        self.frames_seen = 0
+        self.pitch_method = pitch_method
+
+        self._window = np.hanning(NFFT + 1)[:-1].astype(np.float32)  # periodic Hann, as librosa.stft
+        mel_basis, dct = features.mfcc_bases(sr, NFFT, features.MFCC_N_MELS, N_MFCC)
+        self._mel_basis = mel_basis.astype(np.float32)
+        self._dct = dct.astype(np.float32)
+        self._freqs = np.fft.rfftfreq(NFFT, 1.0 / sr).astype(np.float32)
+        self._prev_log_mel = None
+        self._peak_db = -np.inf
+        self._peak_energy = 0.0
+        self._offset = (NFFT - FRAME_LENGTH) // 2   # start of the centred short window
+
+    # --- frame-level features for a block of complete frames ---
+    def _frame_features(self, samples):
+        frames = np.lib.stride_tricks.sliding_window_view(samples, NFFT)[::HOP_LENGTH]
+        n = len(frames)
+
+        S = np.abs(np.fft.rfft(frames * self._window, axis=1)).astype(np.float32)
+        log_mel = 10.0 * np.log10(np.maximum(S**2 @ self._mel_basis.T, 1e-10))
+        self._peak_db = max(self._peak_db, float(log_mel.max()))
+        log_mel = np.maximum(log_mel, self._peak_db - TOP_DB)
+        mfcc = log_mel @ self._dct.T
+        centroid = (S @ self._freqs) / np.maximum(S.sum(axis=1), 1e-10)
+
+        prev = log_mel[:1] if self._prev_log_mel is None else self._prev_log_mel[None]
+        flux = np.maximum(0.0, np.diff(np.vstack([prev, log_mel]), axis=0)).mean(axis=1)
+        self._prev_log_mel = log_mel[-1]
+
+        short = frames[:, self._offset:self._offset + FRAME_LENGTH]
+        energy = np.sqrt(np.mean(short**2, axis=1))
+        zcr = np.mean(np.abs(np.diff(np.signbit(short), axis=1)), axis=1)
+
+        # Pitch over the centred short windows of the same frames; NaN when unvoiced
+        segment = samples[self._offset:self._offset + (n - 1) * HOP_LENGTH + FRAME_LENGTH]
+        if self.pitch_method == "pyin":
+            f0, _, _ = self._librosa.pyin(
+                segment, fmin=PITCH_FMIN, fmax=PITCH_FMAX, sr=self.sr,
+                frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH, center=False,
+            )
+        else:
+            f0 = self._librosa.yin(
+                segment, fmin=PITCH_FMIN, fmax=PITCH_FMAX, sr=self.sr,
+                frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH, center=False,
+            )
+            self._peak_energy = max(self._peak_energy, float(energy.max()))
+            gate = 20 * np.log10(np.maximum(energy, 1e-10) / max(self._peak_energy, 1e-10))
+            f0 = np.where(gate > -VOICED_TOP_DB, f0, np.nan)
+        f0 = np.where(np.isnan(f0[:n]), PITCH_FMIN, f0[:n])
+
+        return np.column_stack([
+            mfcc,
+            np.maximum(zcr, 1e-6), np.maximum(energy, 1e-6), f0,
+            np.maximum(centroid, 1e-6), np.maximum(flux, 1e-4),
+        ])
+
+    def _append(self, rows):
+        for start in range(0, len(rows), self.capacity):
+            block = rows[start:start + self.capacity]
+            end = self._head + len(block)
+            if end <= self.capacity:
+                self._ring[self._head:end] = block
+            else:
+                split = self.capacity - self._head
+                self._ring[self._head:] = block[:split]
+                self._ring[:end - self.capacity] = block[split:]
+            self._head = end % self.capacity
+            self._filled = min(self.capacity, self._filled + len(block))
+
+    def window(self):
+        # Frames of the rolling window in time order
+        if self._filled < self.capacity:
+            return self._ring[:self._filled]
+        return np.concatenate([self._ring[self._head:], self._ring[:self._head]])
+
+    def push(self, chunk):
+        # Feed float PCM in [-1, 1]; returns a result dict when a new score is due
+        samples = np.concatenate([self._carry, np.asarray(chunk, dtype=np.float32)])
+        n_frames = 0 if len(samples) < NFFT else 1 + (len(samples) - NFFT) // HOP_LENGTH
+        if n_frames < self.update_frames:
+            self._carry = samples
+            return None
+
+        self._append(self._frame_features(samples[:(n_frames - 1) * HOP_LENGTH + NFFT]))
+        self._carry = samples[n_frames * HOP_LENGTH:]
+        self.frames_seen += n_frames
+        return self.score()
+
+    def flush(self):
+        # Score whatever is still buffered at the end of the stream
+        if len(self._carry) >= NFFT:
+            n_frames = 1 + (len(self._carry) - NFFT) // HOP_LENGTH
+            self._append(self._frame_features(self._carry[:(n_frames - 1) * HOP_LENGTH + NFFT]))
+            self._carry = self._carry[n_frames * HOP_LENGTH:]
+            self.frames_seen += n_frames
+        return self.score()
+
+    def score(self):
+        frames = self.window().astype(np.float64)
+        if len(frames) < 2:
+            return None
+        table = {name: frames[:, i] for i, name in enumerate(FRAME_COLUMNS)}
+        refined = refined_features_from_frames(table)
+        prediction, score = predict_truth_or_lie_from_features(refined)
+        return {
+            "time": self.frames_seen * HOP_LENGTH / self.sr,
+            "window_seconds": len(frames) * HOP_LENGTH / self.sr,
+            "prediction": prediction,
+            "score": score,
+            "features": refined,
+        }
+
+# === Sources ===
+def pcm16_chunks(stream, chunk_bytes=CHUNK_BYTES):
+    # Raw little-endian 16-bit mono PCM from a pipe or socket file object
+    leftover = b""
+    while True:
+        data = stream.read(chunk_bytes)
+        if not data:
+            break
+        data = leftover + data
+        usable = len(data) - len(data) % 2
+        leftover = data[usable:]
+        yield np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+
+def resampled(chunks, rate, sr=SAMPLE_RATE):
+    # The frame grid, pause durations and pitch range all assume SAMPLE_RATE, so any
+    # other input rate is resampled on the fly instead of being scored as is
+    if rate == sr:
+        yield from chunks
+        return
+    import soxr
+    resampler = soxr.ResampleStream(rate, sr, 1, dtype="float32")
+    for chunk in chunks:
+        yield resampler.resample_chunk(chunk)
+    yield resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+
+def file_chunks(path, sr=SAMPLE_RATE, block_seconds=0.1):
+    import soundfile as sf
+
+    info = sf.info(path)
+    blocks = sf.blocks(path, blocksize=int(info.samplerate * block_seconds), dtype="float32", always_2d=True)
+    yield from resampled((block.mean(axis=1) for block in blocks), info.samplerate, sr)
+
+def _report(result):
+    print(f"[{result['time']:8.2f}s] {result['prediction'].upper():5s} score={result['score']:.2f} "
+          f"(window {result['window_seconds']:.1f}s)", flush=True)
+
+def run(chunks, scorer):
+    for chunk in chunks:
+        result = scorer.push(chunk)
+        if result is not None:
+            _report(result)
+    result = scorer.flush()
+    if result is not None:
+        _report(result)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rolling truth score over live audio.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--file", help="audio file, streamed block by block")
+    source.add_argument("--stdin", action="store_true", help="raw s16le mono PCM on stdin")
+    source.add_argument("--listen", metavar="HOST:PORT", help="accept one TCP connection sending s16le mono PCM")
+    parser.add_argument("--rate", type=int, default=SAMPLE_RATE, help=f"sample rate of raw PCM input (resampled to {SAMPLE_RATE} Hz)")
+    parser.add_argument("--window", type=float, default=WINDOW_SECONDS)
+    parser.add_argument("--update", type=float, default=UPDATE_SECONDS)
+    parser.add_argument("--pitch", choices=["pyin", "yin"], default=PITCH_METHOD)
+    args = parser.parse_args()
+
+    # Always scored at SAMPLE_RATE; --rate only describes the raw PCM coming in
+    scorer = StreamingScorer(sr=SAMPLE_RATE, window_seconds=args.window, update_seconds=args.update,
+                             pitch_method=args.pitch)
+    if args.file:
+        run(file_chunks(args.file), scorer)
+    elif args.stdin:
+        run(resampled(pcm16_chunks(sys.stdin.buffer), args.rate), scorer)
+    else:
+        host, port = args.listen.rsplit(":", 1)
+        with socket.create_server((host, int(port))) as server:
+            conn, _ = server.accept()
+            with conn, conn.makefile("rb") as stream:
+                run(resampled(pcm16_chunks(stream), args.rate), scorer)
@@ -1,36 +1,144 @@
 import os
-import librosa
-import matplotlib.pyplot as plt
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
 
 # === CONFIG ===
 INPUT_DIR = "cleaning/cleaned_data"  # folder with 'lie' and 'truth'
 OUTPUT_DIR = "waveforms"      # where to save plots
 SAMPLE_RATE = 16000           # match your preprocessed sample rate
+FIGSIZE = (8, 3)
+DPI = 100                     # savefig default; FIGSIZE[0] * DPI pixel columns
 
-# Create output folders
-os.makedirs(os.path.join(OUTPUT_DIR, "lie"), exist_ok=True)
-os.makedirs(os.path.join(OUTPUT_DIR, "truth"), exist_ok=True)
-
-# === Function to plot waveform ===
-def plot_waveform(audio_path, output_path):
-    y, sr = librosa.load(audio_path, sr=SAMPLE_RATE)
-    plt.figure(figsize=(8, 3))
-    plt.plot(y, color='blue')
-    plt.title("Amplitude vs Samples")
-    plt.xlabel("Number of Samples")
-    plt.ylabel("Amplitude")
-    plt.tight_layout()
-    plt.savefig(output_path)
-    plt.close()
+# === Min/max envelope decimation ===
+def envelope_indices(y, columns):
+    # For each of `columns` equal bins, the indices of its min and max sample in time
+    # order. Drawing only these points gives the same picture as plotting every sample
+    # once there are more samples than pixel columns.
+    y = np.asarray(y)
+    n = len(y)
+    if n <= 2 * columns:
+        return np.arange(n)
+    width = -(-n // columns)                       # ceil(n / columns) samples per column
+    rows = -(-n // width)
+    padded = np.empty(rows * width, dtype=y.dtype)
+    padded[:n] = y
+    padded[n:] = y[-1]                             # pad with the last sample, never a new extreme
+    bins = padded.reshape(rows, width)
+    offsets = np.arange(rows)[:, None] * width
+    pair = np.sort(np.stack([bins.argmin(axis=1), bins.argmax(axis=1)], axis=1), axis=1)
+    return np.minimum(pair + offsets, n - 1).ravel()
+
+def decimate(x, y, columns=FIGSIZE[0] * DPI):
+    # (x, y) reduced to a per-column min/max envelope, for long feature time series
+    y = np.asarray(y)
+    idx = envelope_indices(y, int(columns))
+    return np.asarray(x)[idx], y[idx]
+
+# === Renderer: one Agg figure per process, reused for every file ===
+_figure = None
+
+def _get_figure():
+    global _figure
+    if _figure is None:
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        fig, ax = plt.subplots(figsize=FIGSIZE, dpi=DPI)
+        (line,) = ax.plot([], [], color='blue')
+        ax.set_title("Amplitude vs Samples")
+        ax.set_xlabel("Number of Samples")
+        ax.set_ylabel("Amplitude")
+        _figure = (fig, ax, line)
+    return _figure
+
+def plot_waveform(audio_path, output_path, y=None):
+    if y is None:
+        import audioio
+        y, _ = audioio.load(audio_path, sr=SAMPLE_RATE)
+    fig, ax, line = _get_figure()
+
+    idx = envelope_indices(y, FIGSIZE[0] * DPI)
+    line.set_data(idx, y[idx])
+    ax.relim()
+    ax.autoscale_view()
+    fig.tight_layout()
+    fig.savefig(output_path)
+    return output_path
+
+def plot_corpus_clip(corpus_path, index, output_path):
+    import corpus
+    return plot_waveform(None, output_path, y=corpus.open_corpus(corpus_path).clip(index))
+
+def list_corpus_jobs(corpus_path, output_dir=OUTPUT_DIR, force=False):
+    # Up to date = PNG newer than the packed corpus
+    import corpus
+    packed = corpus.Corpus(corpus_path)
+    jobs, skipped = [], 0
+    for index, clip in enumerate(packed.clips):
+        os.makedirs(os.path.join(output_dir, clip["label"]), exist_ok=True)
+        output_path = os.path.join(output_dir, clip["label"], clip["name"] + ".png")
+        if not force and is_up_to_date(packed.path + ".npy", output_path):
+            skipped += 1
+            continue
+        jobs.append((index, output_path))
+    return jobs, skipped
+
+def is_up_to_date(audio_path, output_path):
+    return os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(audio_path)
+
+def list_jobs(input_dir=INPUT_DIR, output_dir=OUTPUT_DIR, force=False):
+    jobs, skipped = [], 0
+    for label in ["lie", "truth"]:
+        input_folder = os.path.join(input_dir, label)
+        output_folder = os.path.join(output_dir, label)
+        os.makedirs(output_folder, exist_ok=True)
+
+        for file in sorted(os.listdir(input_folder)):
+            if file.endswith(".wav"):
+                input_path = os.path.join(input_folder, file)
+                output_path = os.path.join(output_folder, file.replace(".wav", ".png"))
+                if not force and is_up_to_date(input_path, output_path):
+                    skipped += 1
+                    continue
+                jobs.append((input_path, output_path))
+    return jobs, skipped
+
+def _init_worker():
+    os.environ["MPLBACKEND"] = "Agg"
+
+def render_all(jobs, workers=None, corpus_path=None):
+    workers = workers or os.cpu_count() or 1
+    errors = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        if corpus_path:
+            futures = {pool.submit(plot_corpus_clip, corpus_path, index, dst): dst for index, dst in jobs}
+        else:
+            futures = {pool.submit(plot_waveform, src, dst): src for src, dst in jobs}
+        for future in as_completed(futures):
+            src = futures[future]
+            try:
+                output_path = future.result()
+                print(f"Saved waveform for {os.path.basename(src)} → {output_path}")
+            except Exception as e:
+                errors.append({"file": src, "error": f"{type(e).__name__}: {e}"})
+                print(f"⚠️ Failed {src}: {e}")
+    return errors
 
 # === Generate waveform plots ===
-for label in ["lie", "truth"]:
-    input_folder = os.path.join(INPUT_DIR, label)
-    output_folder = os.path.join(OUTPUT_DIR, label)
-
-    for file in os.listdir(input_folder):
-        if file.endswith(".wav"):
-            input_path = os.path.join(input_folder, file)
-            output_path = os.path.join(output_folder, file.replace(".wav", ".png"))
-            plot_waveform(input_path, output_path)
-            print(f"Saved waveform for {file} → {output_path}")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render a waveform PNG for every clip in cleaned_data/{lie,truth}.")
+    parser.add_argument("--input-dir", default=INPUT_DIR)
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="re-render PNGs that are newer than their WAV")
+    parser.add_argument("--corpus", default=None, help="read clips from this packed corpus instead of --input-dir")
+    args = parser.parse_args()
+
+    if args.corpus:
+        jobs, skipped = list_corpus_jobs(args.corpus, args.output_dir, args.force)
+    else:
+        jobs, skipped = list_jobs(args.input_dir, args.output_dir, args.force)
+    errors = render_all(jobs, args.workers, args.corpus)
+    print(f"Done: {len(jobs) - len(errors)} rendered, {skipped} up to date, {len(errors)} failed")
@@ -0,0 +1,34 @@
+import os
+
+# === Thread caps for process-pool workers ===
+# N workers each starting a full-size BLAS/FFT/OpenMP pool oversubscribe the cores.
+# The environment variables cover libraries that read them when they start their
+# pools (and spawned children); threadpoolctl resizes pools that are already running.
+THREAD_ENV_VARS = [
+    "OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS", "VECLIB_MAXIMUM_THREADS",
+]
+
+def set_thread_env(threads_per_worker):
+    # In the parent, before the pool starts: children inherit the environment.
+    # Values the user already exported win.
+    for var in THREAD_ENV_VARS:
+        os.environ.setdefault(var, str(threads_per_worker))
+
+# Set by limit_threads in every pool worker, so code that could start its own pool
+# (pitch.pitch_segmented) stays serial there instead of nesting pools
+POOL_WORKER_ENV = "PIPELINE_POOL_WORKER"
+
+def in_pool_worker():
+    return os.environ.get(POOL_WORKER_ENV) == "1"
+
+def limit_threads(threads_per_worker):
+    # Pool initializer: cap BLAS/FFT pools inside the worker
+    os.environ[POOL_WORKER_ENV] = "1"
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads_per_worker)
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=threads_per_worker)
+    except ImportError:
+        pass